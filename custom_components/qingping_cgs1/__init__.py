@@ -1,15 +1,68 @@
 """The Qingping CGS1 integration."""
 from __future__ import annotations
 
+from datetime import timedelta
+
+import voluptuous as vol
+
+from homeassistant.components import mqtt
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_MAC, Platform
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.service import async_register_admin_service
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 import logging
 
-from .const import DOMAIN, CONF_TEMPERATURE_OFFSET, CONF_HUMIDITY_OFFSET, DEFAULT_OFFSET, CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+from .const import (
+    DOMAIN, CONF_TEMPERATURE_OFFSET, CONF_HUMIDITY_OFFSET, DEFAULT_OFFSET, CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL,
+    CONF_INTERVAL_MODE, INTERVAL_MODE_FIXED, MQTT_TOPIC_PREFIX,
+    SERVICE_START_TRAFFIC_CAPTURE, SERVICE_STOP_TRAFFIC_CAPTURE, ATTR_FILENAME, DEFAULT_TRAFFIC_FILENAME,
+    DATA_TRAFFIC_CAPTURE, CONF_MEMBERS, DATA_GROUPS,
+    CONF_RECORDING_MODE, RECORDING_MODE_STATES, DATA_STATISTICS, CONF_TVOC_UNIT,
+    CONF_OUTLIER_FILTER, OUTLIER_FILTER_OFF,
+    SERVICE_CONFIGURE_DEVICES, ATTR_MACS, ATTR_GROUP, INTERVAL_MODE_ADAPTIVE,
+)
+from .fleet import async_setup_fleet_api
+from .group import GroupRegistry
+from .select import TVOC_UNIT_OPTIONS
+from .sensor import async_publish_configs
+from .statistics import StatisticsBatcher
+from .traffic import TrafficWriter
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.NUMBER, Platform.SELECT]
+GROUP_PLATFORMS: list[Platform] = [Platform.SENSOR]
+
+TRAFFIC_FLUSH_INTERVAL = timedelta(seconds=10)
+
+def _traffic_filename(value):
+    """Validate a capture file name that must stay in the configuration directory."""
+    value = cv.string(value)
+    if value in ("", ".", "..") or "/" in value or "\\" in value:
+        raise vol.Invalid("filename must be a file name without folders")
+    return value
+
+START_TRAFFIC_CAPTURE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_FILENAME, default=DEFAULT_TRAFFIC_FILENAME): _traffic_filename,
+})
+
+CONFIGURE_DEVICES_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Optional(ATTR_MACS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_GROUP): cv.string,
+        vol.Optional(CONF_UPDATE_INTERVAL): vol.All(vol.Coerce(int), vol.Range(min=5, max=120)),
+        vol.Optional(CONF_INTERVAL_MODE): vol.In([INTERVAL_MODE_FIXED, INTERVAL_MODE_ADAPTIVE]),
+        vol.Optional(CONF_TEMPERATURE_OFFSET): vol.All(vol.Coerce(float), vol.Range(min=-10, max=10)),
+        vol.Optional(CONF_HUMIDITY_OFFSET): vol.All(vol.Coerce(float), vol.Range(min=-10, max=10)),
+        vol.Optional(CONF_TVOC_UNIT): vol.In(TVOC_UNIT_OPTIONS),
+    }),
+    cv.has_at_least_one_key(ATTR_MACS, ATTR_GROUP),
+)
+DEVICE_SETTINGS = [CONF_UPDATE_INTERVAL, CONF_INTERVAL_MODE, CONF_TEMPERATURE_OFFSET, CONF_HUMIDITY_OFFSET, CONF_TVOC_UNIT]
+# Settings the device itself has to be told about; the rest only affect Home Assistant
+DOWNLINK_SETTINGS = {CONF_UPDATE_INTERVAL, CONF_INTERVAL_MODE}
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,6 +70,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Qingping CGS1 from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    if CONF_MEMBERS in entry.data:
+        hass.data.setdefault(DATA_GROUPS, GroupRegistry())
+        await hass.config_entries.async_forward_entry_setups(entry, GROUP_PLATFORMS)
+        return True
+
     async def async_update_data():
         """Fetch data from API endpoint.
 
@@ -44,17 +102,151 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         CONF_TEMPERATURE_OFFSET: entry.data.get(CONF_TEMPERATURE_OFFSET, DEFAULT_OFFSET),
         CONF_HUMIDITY_OFFSET: entry.data.get(CONF_HUMIDITY_OFFSET, DEFAULT_OFFSET),
         CONF_UPDATE_INTERVAL: entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+        CONF_INTERVAL_MODE: entry.data.get(CONF_INTERVAL_MODE, INTERVAL_MODE_FIXED),
+        CONF_RECORDING_MODE: entry.data.get(CONF_RECORDING_MODE, RECORDING_MODE_STATES),
+        CONF_TVOC_UNIT: entry.data.get(CONF_TVOC_UNIT, "ppb"),
+        CONF_OUTLIER_FILTER: entry.data.get(CONF_OUTLIER_FILTER, OUTLIER_FILTER_OFF),
         "coordinator": coordinator,
     }
 
     coordinator.data = hass.data[DOMAIN][entry.entry_id]
 
+    _async_register_services(hass)
+    async_setup_fleet_api(hass)
+    if DATA_STATISTICS not in hass.data:
+        hass.data[DATA_STATISTICS] = StatisticsBatcher(hass)
+        await hass.data[DATA_STATISTICS].async_start()
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    if CONF_MEMBERS in entry.data:
+        unload_ok = await hass.config_entries.async_unload_platforms(entry, GROUP_PLATFORMS)
+        if unload_ok:
+            hass.data[DATA_GROUPS].remove(entry.entry_id)
+        return unload_ok
+
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
-    return unload_ok
\ No newline at end of file
+        if not hass.data[DOMAIN]:
+            await hass.data.pop(DATA_STATISTICS).async_stop()
+            await _async_stop_traffic_capture(hass)
+            for service in (SERVICE_START_TRAFFIC_CAPTURE, SERVICE_STOP_TRAFFIC_CAPTURE, SERVICE_CONFIGURE_DEVICES):
+                hass.services.async_remove(DOMAIN, service)
+    return unload_ok
+
+@callback
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration services once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_START_TRAFFIC_CAPTURE):
+        return
+
+    async def async_start_traffic_capture(call: ServiceCall) -> None:
+        """Start writing raw Qingping MQTT traffic to a file."""
+        await _async_start_traffic_capture(hass, hass.config.path(call.data[ATTR_FILENAME]))
+
+    async def async_stop_traffic_capture(call: ServiceCall) -> None:
+        """Stop the running traffic capture."""
+        await _async_stop_traffic_capture(hass)
+
+    # Captures write files and record every device's traffic, so only admins may run them
+    async_register_admin_service(
+        hass, DOMAIN, SERVICE_START_TRAFFIC_CAPTURE, async_start_traffic_capture, schema=START_TRAFFIC_CAPTURE_SCHEMA
+    )
+    async_register_admin_service(hass, DOMAIN, SERVICE_STOP_TRAFFIC_CAPTURE, async_stop_traffic_capture)
+
+    async def async_configure_devices(call: ServiceCall) -> ServiceResponse:
+        """Apply settings to many devices with one batched downlink pass."""
+        return await _async_configure_devices(hass, call.data)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_CONFIGURE_DEVICES, async_configure_devices,
+        schema=CONFIGURE_DEVICES_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+
+def _normalize_mac(mac: str) -> str:
+    """Return a MAC in upper case without separators, as devices report it."""
+    return mac.replace(":", "").replace("-", "").strip().upper()
+
+async def _async_configure_devices(hass: HomeAssistant, data) -> dict:
+    """Update settings in memory, persist each entry once and publish configs together."""
+    macs = list(data.get(ATTR_MACS, []))
+    if ATTR_GROUP in data:
+        groups = [
+            entry for entry in hass.config_entries.async_entries(DOMAIN)
+            if CONF_MEMBERS in entry.data and data[ATTR_GROUP] in (entry.title, entry.entry_id)
+        ]
+        if not groups:
+            raise ServiceValidationError(f"Unknown Qingping device group: {data[ATTR_GROUP]}")
+        for entry in groups:
+            macs.extend(entry.data[CONF_MEMBERS])
+
+    settings = {key: data[key] for key in DEVICE_SETTINGS if key in data}
+    entries_by_mac = {
+        _normalize_mac(entry_data["config"][CONF_MAC]): (entry_id, entry_data["config"][CONF_MAC])
+        for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+    }
+
+    results = {}
+    targets = []
+    requested = {}
+    for mac in macs:
+        requested.setdefault(_normalize_mac(mac), mac)
+    for normalized, mac in requested.items():
+        entry_id, mac = entries_by_mac.get(normalized, (None, mac))
+        entry = hass.config_entries.async_get_entry(entry_id) if entry_id else None
+        if entry is None:
+            results[mac] = {"success": False, "latency": None, "error": "not configured"}
+            continue
+
+        coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
+        coordinator.data.update(settings)
+        if CONF_INTERVAL_MODE in settings:
+            controller = hass.data[DOMAIN][entry_id].get("interval_controller")
+            if controller is not None:
+                controller.reset()
+        hass.config_entries.async_update_entry(entry, data={**entry.data, **settings})
+        coordinator.async_update_listeners()
+
+        if DOWNLINK_SETTINGS.intersection(settings):
+            targets.append((entry, mac, coordinator))
+        else:
+            results[mac] = {"success": True, "latency": None}
+
+    results.update(await async_publish_configs(hass, targets))
+    return {"devices": results}
+
+async def _async_start_traffic_capture(hass: HomeAssistant, path: str) -> None:
+    """Subscribe to all Qingping up and down topics and record them to path."""
+    await _async_stop_traffic_capture(hass)
+
+    writer = TrafficWriter(path)
+
+    @callback
+    def message_captured(message):
+        writer.add(message.topic, message.payload)
+
+    async def flush(*_):
+        await hass.async_add_executor_job(writer.flush)
+
+    unsubscribes = [
+        await mqtt.async_subscribe(hass, f"{MQTT_TOPIC_PREFIX}/+/{direction}", message_captured, 1, encoding=None)
+        for direction in ("up", "down")
+    ]
+    unsubscribes.append(async_track_time_interval(hass, flush, TRAFFIC_FLUSH_INTERVAL))
+    hass.data[DATA_TRAFFIC_CAPTURE] = (writer, unsubscribes)
+    _LOGGER.info("Started Qingping traffic capture to %s", path)
+
+async def _async_stop_traffic_capture(hass: HomeAssistant) -> None:
+    """Stop the running traffic capture, if any, and write out what is buffered."""
+    capture = hass.data.pop(DATA_TRAFFIC_CAPTURE, None)
+    if capture is None:
+        return
+    writer, unsubscribes = capture
+    for unsubscribe in unsubscribes:
+        unsubscribe()
+    await hass.async_add_executor_job(writer.flush)
+    _LOGGER.info("Stopped Qingping traffic capture, %s messages written to %s", writer.count, writer.path)
@@ -12,8 +12,12 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.components import mqtt
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN, MQTT_TOPIC_PREFIX
+from .const import (
+    DOMAIN, MQTT_TOPIC_PREFIX,
+    CONF_MEMBERS, CONF_MEASUREMENTS, GROUP_MEASUREMENTS, DEFAULT_GROUP_MEASUREMENTS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +34,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        if self._configured_devices():
+            return self.async_show_menu(step_id="user", menu_options=["device", "group"])
+        return await self.async_step_device()
+
+    async def async_step_device(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a discovered device."""
         errors = {}
 
         try:
@@ -51,7 +63,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 })
 
                 return self.async_show_form(
-                    step_id="user",
+                    step_id="device",
                     data_schema=data_schema,
                     errors=errors,
                 )
@@ -68,10 +80,48 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             _LOGGER.error("Unexpected exception in Qingping CGS1 config flow: %s", ex)
             errors["base"] = "unknown"
             return self.async_show_form(
-                step_id="user",
+                step_id="device",
                 errors=errors,
             )
 
+    async def async_step_group(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle creating a group of devices with aggregate sensors."""
+        errors = {}
+        devices = self._configured_devices()
+
+        if user_input is not None:
+            if not user_input[CONF_MEMBERS]:
+                errors[CONF_MEMBERS] = "no_members"
+            elif not user_input[CONF_MEASUREMENTS]:
+                errors[CONF_MEASUREMENTS] = "no_measurements"
+            else:
+                await self.async_set_unique_id(f"group_{user_input[CONF_NAME]}")
+                self._abort_if_unique_id_configured()
+                return self.async_create_entry(title=user_input[CONF_NAME], data=user_input)
+
+        return self.async_show_form(
+            step_id="group",
+            data_schema=vol.Schema({
+                vol.Required(CONF_NAME): str,
+                vol.Required(CONF_MEMBERS, default=[]): cv.multi_select(devices),
+                vol.Required(CONF_MEASUREMENTS, default=DEFAULT_GROUP_MEASUREMENTS): cv.multi_select(
+                    {measurement: measurement for measurement in GROUP_MEASUREMENTS}
+                ),
+            }),
+            errors=errors,
+        )
+
+    @callback
+    def _configured_devices(self) -> dict[str, str]:
+        """Return configured devices as a MAC to title mapping."""
+        return {
+            entry.data[CONF_MAC]: entry.title
+            for entry in self._async_current_entries()
+            if CONF_MAC in entry.data
+        }
+
     async def async_step_no_devices(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -137,12 +187,15 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     _LOGGER.error("Error handling MQTT message: %s", ex)
 
             # Subscribe to the MQTT topic
-            await mqtt.async_subscribe(
+            unsubscribe = await mqtt.async_subscribe(
                 self.hass, f"{MQTT_TOPIC_PREFIX}/#", _handle_message
             )
 
             # Wait for a short time to collect messages
-            await asyncio.sleep(10)  # Increased to 10 seconds for better discovery
+            try:
+                await asyncio.sleep(10)  # Increased to 10 seconds for better discovery
+            finally:
+                unsubscribe()
 
             _LOGGER.info(f"Discovered {len(self._discovered_devices)} new Qingping CGS1 devices")
 
@@ -12,6 +12,16 @@ SENSOR_PM10 = "pm10"
 SENSOR_PM25 = "pm25"
 SENSOR_TEMPERATURE = "temperature"
 SENSOR_TVOC = "tvoc"
+SENSOR_PM1 = "pm1"
+SENSOR_NOISE = "noise"
+SENSOR_CO2_PERCENT = "co2_percent"
+
+# Groups
+CONF_MEMBERS = "members"
+CONF_MEASUREMENTS = "measurements"
+GROUP_MEASUREMENTS = [SENSOR_CO2, SENSOR_PM25, SENSOR_PM10, SENSOR_TEMPERATURE, SENSOR_HUMIDITY, SENSOR_TVOC]
+DEFAULT_GROUP_MEASUREMENTS = [SENSOR_CO2, SENSOR_PM25]
+DATA_GROUPS = f"{DOMAIN}_groups"
 
 # Unit of measurement
 PERCENTAGE = "%"
@@ -24,14 +34,49 @@ CONF_TVOC_UNIT = "tvoc_unit"
 CONF_TEMPERATURE_OFFSET = "temperature_offset"
 CONF_HUMIDITY_OFFSET = "humidity_offset"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_INTERVAL_MODE = "interval_mode"
+
+# Update interval modes
+INTERVAL_MODE_FIXED = "fixed"
+INTERVAL_MODE_ADAPTIVE = "adaptive"
+
+# Recording modes
+CONF_RECORDING_MODE = "recording_mode"
+RECORDING_MODE_STATES = "states"
+RECORDING_MODE_STATISTICS = "statistics"
+DATA_STATISTICS = f"{DOMAIN}_statistics"
+
+# Outlier filter
+CONF_OUTLIER_FILTER = "outlier_filter"
+OUTLIER_FILTER_OFF = "off"
+OUTLIER_FILTER_HAMPEL = "hampel"
 
 # Default values for offsets and update interval
 DEFAULT_OFFSET = 0
 DEFAULT_UPDATE_INTERVAL = 15
 
+# Bounds for the adaptive update interval, in seconds
+ADAPTIVE_MIN_INTERVAL = 15
+ADAPTIVE_MAX_INTERVAL = 120
+
 # MQTT topics
 MQTT_TOPIC_PREFIX = "qingping"
 
+# Services
+SERVICE_START_TRAFFIC_CAPTURE = "start_traffic_capture"
+SERVICE_STOP_TRAFFIC_CAPTURE = "stop_traffic_capture"
+SERVICE_CONFIGURE_DEVICES = "configure_devices"
+ATTR_FILENAME = "filename"
+ATTR_MACS = "macs"
+ATTR_GROUP = "group"
+DEFAULT_TRAFFIC_FILENAME = "qingping_traffic.bin"
+DATA_TRAFFIC_CAPTURE = f"{DOMAIN}_traffic_capture"
+
+# Dispatcher signal sent with the entry id whenever a device's values change
+SIGNAL_DEVICE_UPDATED = f"{DOMAIN}_device_updated"
+# Dispatcher signal, formatted with the entry id, sent with sensorData keys seen for the first time
+SIGNAL_NEW_KEYS = f"{DOMAIN}_new_keys_{{}}"
+
 # Configuration message
 ATTR_TYPE = "type"
 ATTR_UP_ITVL = "up_itvl"
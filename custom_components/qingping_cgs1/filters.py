@@ -0,0 +1,91 @@
+"""Streaming outlier filter for Qingping CGS1 readings."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import deque
+
+HAMPEL_WINDOW = 9  # samples
+HAMPEL_THRESHOLD = 3  # scaled MADs a sample may sit from the median
+MAD_SCALE = 1.4826  # makes the MAD comparable to a standard deviation
+
+
+class HampelFilter:
+    """Reject single-sample spikes that sit far from the rolling median.
+
+    The window is kept sorted with bisect, so the median is read directly and
+    the MAD is found by walking outwards from the median. Every sample, kept or
+    rejected, enters the window, so a real level change is accepted once it
+    makes up half of the window.
+    """
+
+    def __init__(self, min_deviation, window=HAMPEL_WINDOW, threshold=HAMPEL_THRESHOLD):
+        """Initialize the filter.
+
+        min_deviation is the smallest distance from the median that can be
+        rejected, so a steady signal with a MAD of zero does not reject every
+        small change.
+        """
+        self._min_deviation = min_deviation
+        self._threshold = threshold
+        self._window = deque(maxlen=window)
+        self._sorted = []
+        self.rejected = 0
+
+    def accept(self, value):
+        """Add a sample and return False if it is an outlier."""
+        is_outlier = False
+        if len(self._sorted) > self._window.maxlen // 2:
+            median = self._median()
+            limit = max(self._threshold * MAD_SCALE * self._mad(median), self._min_deviation)
+            is_outlier = abs(value - median) > limit
+
+        if len(self._window) == self._window.maxlen:
+            oldest = self._window[0]
+            del self._sorted[bisect_left(self._sorted, oldest)]
+        self._window.append(value)
+        insort(self._sorted, value)
+
+        if is_outlier:
+            self.rejected += 1
+        return not is_outlier
+
+    def _median(self):
+        """Return the median of the window."""
+        values = self._sorted
+        middle = len(values) // 2
+        if len(values) % 2:
+            return values[middle]
+        return (values[middle - 1] + values[middle]) / 2
+
+    def _mad(self, median):
+        """Return the median absolute deviation from median.
+
+        Deviations grow in both directions away from the median position in the
+        sorted window, so merging the two sides yields them in order and only
+        half the window has to be walked.
+        """
+        values = self._sorted
+        count = len(values)
+        right = bisect_left(values, median)
+        left = right - 1
+        target = count // 2
+        deviation = 0.0
+        previous = 0.0
+        for index in range(target + 1):
+            if left < 0:
+                take_right = True
+            elif right >= count:
+                take_right = False
+            else:
+                take_right = values[right] - median <= median - values[left]
+            if take_right:
+                deviation = values[right] - median
+                right += 1
+            else:
+                deviation = median - values[left]
+                left -= 1
+            if index == target - 1:
+                previous = deviation
+        if count % 2:
+            return deviation
+        return (previous + deviation) / 2
@@ -0,0 +1,116 @@
+"""Fleet-wide snapshot API for Qingping CGS1 devices."""
+from __future__ import annotations
+
+from http import HTTPStatus
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.const import CONF_MAC, CONF_NAME
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN, SIGNAL_DEVICE_UPDATED
+from .sensor import SENSOR_DESCRIPTIONS, QingpingCGS1Sensor, QingpingCGS1StatusSensor, QingpingCGS1BatteryStateSensor
+
+DATA_FLEET_API = f"{DOMAIN}_fleet_api"
+
+# Every known measurement; keys outside SENSOR_DESCRIPTIONS stay out of snapshots and deltas alike
+READING_FIELDS = sorted(SENSOR_DESCRIPTIONS)
+SNAPSHOT_FIELDS = [CONF_MAC, CONF_NAME, "status", "charging", *READING_FIELDS]
+
+
+@callback
+def async_setup_fleet_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands and HTTP view once."""
+    if hass.data.get(DATA_FLEET_API):
+        return
+    hass.data[DATA_FLEET_API] = True
+    websocket_api.async_register_command(hass, websocket_snapshot)
+    websocket_api.async_register_command(hass, websocket_subscribe_snapshot)
+    hass.http.register_view(QingpingFleetSnapshotView)
+
+
+@callback
+def device_snapshot(entry_data) -> dict:
+    """Return the latest in-memory values for one device."""
+    config = entry_data["config"]
+    row = dict.fromkeys(SNAPSHOT_FIELDS)
+    row[CONF_MAC] = config[CONF_MAC]
+    row[CONF_NAME] = config[CONF_NAME]
+    for sensor in entry_data.get("sensors", []):
+        if isinstance(sensor, QingpingCGS1StatusSensor):
+            row["status"] = sensor.native_value
+        elif isinstance(sensor, QingpingCGS1BatteryStateSensor):
+            if sensor.native_value is not None:
+                row["charging"] = sensor.native_value == "Charging"
+        elif isinstance(sensor, QingpingCGS1Sensor) and sensor._sensor_type in row:
+            row[sensor._sensor_type] = sensor.native_value
+    return row
+
+
+def _to_columns(rows) -> dict:
+    """Turn device rows into one list per field."""
+    columns = {field: [] for field in SNAPSHOT_FIELDS}
+    for row in rows:
+        for field in SNAPSHOT_FIELDS:
+            columns[field].append(row[field])
+    return columns
+
+
+@callback
+def fleet_snapshot(hass: HomeAssistant) -> dict:
+    """Return all devices in columnar form."""
+    return _to_columns(device_snapshot(entry_data) for entry_data in hass.data.get(DOMAIN, {}).values())
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/snapshot"})
+@callback
+def websocket_snapshot(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Return the current fleet snapshot."""
+    connection.send_result(msg["id"], fleet_snapshot(hass))
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/subscribe_snapshot"})
+@callback
+def websocket_subscribe_snapshot(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Send the fleet snapshot, then only the fields that change per device."""
+    last_sent = {
+        entry_id: device_snapshot(entry_data)
+        for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+    }
+
+    @callback
+    def forward_changes(entry_id):
+        entry_data = hass.data.get(DOMAIN, {}).get(entry_id)
+        if entry_data is None:
+            return
+        row = device_snapshot(entry_data)
+        previous = last_sent.get(entry_id, {})
+        changes = {field: value for field, value in row.items() if previous.get(field) != value}
+        if not changes:
+            return
+        last_sent[entry_id] = row
+        connection.send_message(websocket_api.event_message(
+            msg["id"], {CONF_MAC: row[CONF_MAC], "changes": changes}
+        ))
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(hass, SIGNAL_DEVICE_UPDATED, forward_changes)
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(
+        msg["id"], {"snapshot": _to_columns(last_sent.values())}
+    ))
+
+
+class QingpingFleetSnapshotView(HomeAssistantView):
+    """Serve the fleet snapshot over HTTP."""
+
+    url = f"/api/{DOMAIN}/snapshot"
+    name = f"api:{DOMAIN}:snapshot"
+
+    @callback
+    def get(self, request):
+        """Return the current fleet snapshot."""
+        hass = request.app[KEY_HASS]
+        return self.json(fleet_snapshot(hass), HTTPStatus.OK)
@@ -0,0 +1,187 @@
+"""Incremental aggregation of readings across groups of Qingping devices."""
+from __future__ import annotations
+
+from collections import defaultdict
+import heapq
+
+# Rebuild a heap once stale entries outnumber live ones by this factor
+HEAP_COMPACT_FACTOR = 2
+
+
+class MeasurementAggregate:
+    """Running min, max, mean and count of one measurement over a set of devices.
+
+    Updates cost O(log n): the sum is kept incrementally and min/max come from
+    heaps whose outdated entries are skipped lazily and compacted in bulk.
+    """
+
+    def __init__(self):
+        """Initialize the aggregate."""
+        self._values = {}
+        self._sum = 0.0
+        self._min_heap = []
+        self._max_heap = []
+
+    @property
+    def count(self):
+        """Return the number of devices contributing a value."""
+        return len(self._values)
+
+    @property
+    def mean(self):
+        """Return the mean of the current values."""
+        if not self._values:
+            return None
+        return self._sum / len(self._values)
+
+    @property
+    def min(self):
+        """Return the smallest current value."""
+        self._discard_stale(self._min_heap, 1)
+        return self._min_heap[0][0] if self._min_heap else None
+
+    @property
+    def max(self):
+        """Return the largest current value."""
+        self._discard_stale(self._max_heap, -1)
+        return -self._max_heap[0][0] if self._max_heap else None
+
+    def update(self, mac, value):
+        """Set the value reported by a device, returning True if it changed."""
+        previous = self._values.get(mac)
+        if previous == value:
+            return False
+        if previous is not None:
+            self._sum -= previous
+        self._values[mac] = value
+        self._sum += value
+        heapq.heappush(self._min_heap, (value, mac))
+        heapq.heappush(self._max_heap, (-value, mac))
+        self._maybe_compact()
+        return True
+
+    def remove(self, mac):
+        """Drop a device's value, returning True if it had one."""
+        previous = self._values.pop(mac, None)
+        if previous is None:
+            return False
+        self._sum -= previous
+        self._maybe_compact()
+        return True
+
+    def _discard_stale(self, heap, sign):
+        """Pop heap entries that no longer match a device's current value."""
+        while heap:
+            value, mac = heap[0]
+            if self._values.get(mac) == sign * value:
+                return
+            heapq.heappop(heap)
+
+    def _maybe_compact(self):
+        """Rebuild the heaps and the sum when stale entries pile up."""
+        # Reads only pop stale entries from the top, so either heap can grow on its own
+        limit = HEAP_COMPACT_FACTOR * len(self._values) + 8
+        if len(self._min_heap) <= limit and len(self._max_heap) <= limit:
+            return
+        self._min_heap = [(value, mac) for mac, value in self._values.items()]
+        self._max_heap = [(-value, mac) for mac, value in self._values.items()]
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
+        # Recomputing also clears floating point drift in the running sum
+        self._sum = float(sum(self._values.values()))
+
+
+class GroupAggregator:
+    """Aggregates for one named group of devices."""
+
+    def __init__(self, name, members, measurements):
+        """Initialize the group."""
+        self.name = name
+        self.members = set(members)
+        self.measurements = {measurement: MeasurementAggregate() for measurement in measurements}
+        self.online = set()
+        self._listeners = []
+
+    def add_listener(self, update_callback):
+        """Call update_callback(measurement) on changes; returns a remove function."""
+        self._listeners.append(update_callback)
+
+        def remove_listener():
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def update_reading(self, mac, measurement, value):
+        """Feed a device reading into the group."""
+        aggregate = self.measurements.get(measurement)
+        if aggregate is None:
+            return
+        if value is None:
+            changed = aggregate.remove(mac)
+        else:
+            try:
+                changed = aggregate.update(mac, float(value))
+            except (TypeError, ValueError):
+                return
+        if changed:
+            self._notify(measurement)
+
+    def set_online(self, mac, online):
+        """Track whether a member is online; offline members stop contributing values."""
+        if online:
+            if mac in self.online:
+                return
+            self.online.add(mac)
+        else:
+            if mac not in self.online:
+                return
+            self.online.discard(mac)
+            for aggregate in self.measurements.values():
+                aggregate.remove(mac)
+        self._notify(None)
+
+    def _notify(self, measurement):
+        """Tell listeners which measurement changed, or None for all of them."""
+        for update_callback in list(self._listeners):
+            update_callback(measurement)
+
+
+class GroupRegistry:
+    """All configured groups, indexed by member MAC for quick fan-out."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._groups = {}
+        self._by_mac = defaultdict(list)
+
+    def add(self, group_id, group):
+        """Register a group."""
+        self.remove(group_id)
+        self._groups[group_id] = group
+        for mac in group.members:
+            self._by_mac[mac].append(group)
+
+    def remove(self, group_id):
+        """Unregister a group."""
+        group = self._groups.pop(group_id, None)
+        if group is None:
+            return
+        for mac in group.members:
+            groups = self._by_mac[mac]
+            groups.remove(group)
+            if not groups:
+                del self._by_mac[mac]
+
+    def __bool__(self):
+        """Return True while any group is registered."""
+        return bool(self._groups)
+
+    def update_reading(self, mac, measurement, value):
+        """Pass a device reading to every group containing the device."""
+        for group in self._by_mac.get(mac, ()):
+            group.update_reading(mac, measurement, value)
+
+    def set_online(self, mac, online):
+        """Pass a device status change to every group containing the device."""
+        for group in self._by_mac.get(mac, ()):
+            group.set_online(mac, online)
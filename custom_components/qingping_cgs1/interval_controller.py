@@ -0,0 +1,130 @@
+"""Adaptive reporting interval controller for Qingping CGS1 devices."""
+from __future__ import annotations
+
+import time
+
+from .const import (
+    SENSOR_CO2, SENSOR_PM25,
+    ADAPTIVE_MIN_INTERVAL, ADAPTIVE_MAX_INTERVAL,
+)
+
+# Smoothing factor for the moving average of sample-to-sample changes
+VOLATILITY_ALPHA = 0.3
+
+# (enter, leave) thresholds on the averaged absolute change per report.
+# The gap between the two keeps the controller from flapping.
+VOLATILITY_THRESHOLDS = {
+    SENSOR_CO2: (30, 10),
+    SENSOR_PM25: (10, 3),
+}
+
+LOW_BATTERY_LEVEL = 20  # percent
+MIN_CHANGE_PERIOD = 300  # seconds between interval changes pushed to the device
+
+
+class AdaptiveIntervalController:
+    """Pick a reporting interval from battery state and measurement volatility."""
+
+    def __init__(self, min_interval=ADAPTIVE_MIN_INTERVAL, max_interval=ADAPTIVE_MAX_INTERVAL):
+        """Initialize the controller."""
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._last_values = {}
+        self._volatility = {}
+        self._volatile = False
+        self._battery_level = None
+        self._battery_charging = None
+        self._interval = None
+        self._last_change = 0.0
+
+    @property
+    def interval(self):
+        """Return the interval last chosen by the controller, if any."""
+        return self._interval
+
+    @property
+    def volatile(self):
+        """Return True while recent measurements are changing quickly."""
+        return self._volatile
+
+    def reset(self):
+        """Forget the chosen interval so the next evaluation starts fresh."""
+        self._interval = None
+        self._last_change = 0.0
+
+    def observe_battery(self, level=None, charging=None):
+        """Record the latest battery level and charging state."""
+        if level is not None:
+            try:
+                self._battery_level = float(level)
+            except (TypeError, ValueError):
+                pass
+        if charging is not None:
+            self._battery_charging = charging
+
+    def observe(self, sensor_type, value):
+        """Feed a measurement into the volatility estimate."""
+        if sensor_type not in VOLATILITY_THRESHOLDS:
+            return
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+
+        previous = self._last_values.get(sensor_type)
+        self._last_values[sensor_type] = value
+        if previous is None:
+            return
+
+        delta = abs(value - previous)
+        average = self._volatility.get(sensor_type, delta)
+        self._volatility[sensor_type] = average + VOLATILITY_ALPHA * (delta - average)
+        self._update_volatile()
+
+    def _update_volatile(self):
+        """Apply the enter/leave thresholds to the volatility averages."""
+        if self._volatile:
+            self._volatile = any(
+                self._volatility.get(sensor_type, 0) >= leave
+                for sensor_type, (_, leave) in VOLATILITY_THRESHOLDS.items()
+            )
+        else:
+            self._volatile = any(
+                self._volatility.get(sensor_type, 0) >= enter
+                for sensor_type, (enter, _) in VOLATILITY_THRESHOLDS.items()
+            )
+
+    def target_interval(self, base_interval):
+        """Return the interval the current conditions call for."""
+        base_interval = min(max(int(base_interval), self._min_interval), self._max_interval)
+        on_battery = self._battery_charging is False
+        low_battery = (
+            on_battery
+            and self._battery_level is not None
+            and self._battery_level <= LOW_BATTERY_LEVEL
+        )
+
+        if low_battery:
+            return self._max_interval
+        if self._volatile:
+            return self._min_interval
+        if on_battery:
+            return self._max_interval
+        return base_interval
+
+    def evaluate(self, base_interval, now=None):
+        """Return a new interval to publish, or None if nothing should change."""
+        now = time.monotonic() if now is None else now
+        target = self.target_interval(base_interval)
+        if self._interval is None and target == int(base_interval):
+            # The config publish on setup already sent the base interval
+            self._interval = target
+            self._last_change = now
+            return None
+        if target == self._interval:
+            return None
+        if self._interval is not None and now - self._last_change < MIN_CHANGE_PERIOD:
+            return None
+        self._interval = target
+        self._last_change = now
+        return target
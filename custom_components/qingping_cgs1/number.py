@@ -5,11 +5,16 @@ from homeassistant.components.number import NumberEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, CONF_MAC
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import EntityCategory
 
-from .const import DOMAIN, CONF_TEMPERATURE_OFFSET, CONF_HUMIDITY_OFFSET, DEFAULT_OFFSET, CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+from .const import (
+    DOMAIN, CONF_TEMPERATURE_OFFSET, CONF_HUMIDITY_OFFSET, DEFAULT_OFFSET, CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL,
+    SENSOR_TEMPERATURE, SENSOR_HUMIDITY, SIGNAL_NEW_KEYS,
+)
+from .sensor import async_publish_config
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -30,11 +35,25 @@ async def async_setup_entry(
     }
 
     async_add_entities([
-        QingpingCGS1OffsetNumber(coordinator, config_entry, mac, name, "Temp Offset", CONF_TEMPERATURE_OFFSET, device_info, native_temp_unit),
-        QingpingCGS1OffsetNumber(coordinator, config_entry, mac, name, "Humidity Offset", CONF_HUMIDITY_OFFSET, device_info, "%"),
         QingpingCGS1UpdateIntervalNumber(coordinator, config_entry, mac, name, device_info),
     ])
 
+    # Offsets only exist for measurements the device actually reports
+    @callback
+    def add_offset_numbers(keys):
+        entities = []
+        if SENSOR_TEMPERATURE in keys:
+            entities.append(QingpingCGS1OffsetNumber(coordinator, config_entry, mac, name, "Temp Offset", CONF_TEMPERATURE_OFFSET, device_info, native_temp_unit))
+        if SENSOR_HUMIDITY in keys:
+            entities.append(QingpingCGS1OffsetNumber(coordinator, config_entry, mac, name, "Humidity Offset", CONF_HUMIDITY_OFFSET, device_info, "%"))
+        if entities:
+            async_add_entities(entities)
+
+    add_offset_numbers(hass.data[DOMAIN][config_entry.entry_id].get("seen_keys", set()))
+    config_entry.async_on_unload(async_dispatcher_connect(
+        hass, SIGNAL_NEW_KEYS.format(config_entry.entry_id), add_offset_numbers
+    ))
+
 class QingpingCGS1OffsetNumber(CoordinatorEntity, NumberEntity):
     """Representation of a Qingping CGS1 offset number input."""
 
@@ -116,11 +135,7 @@ class QingpingCGS1UpdateIntervalNumber(CoordinatorEntity, NumberEntity):
         await self.coordinator.async_request_refresh()
 
         # Publish new configuration
-        sensors = self.hass.data[DOMAIN][self._config_entry.entry_id].get("sensors", [])
-        for sensor in sensors:
-            if hasattr(sensor, 'publish_config'):
-                await sensor.publish_config()
-                break  # We only need to call it once
+        await async_publish_config(self.hass, self._config_entry, self._mac, self.coordinator)
 
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
@@ -4,14 +4,24 @@ from __future__ import annotations
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, CONF_MAC
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import EntityCategory
 
-from .const import DOMAIN, CONF_TVOC_UNIT
+from .const import (
+    DOMAIN, CONF_TVOC_UNIT, CONF_INTERVAL_MODE, INTERVAL_MODE_FIXED, INTERVAL_MODE_ADAPTIVE,
+    CONF_RECORDING_MODE, RECORDING_MODE_STATES, RECORDING_MODE_STATISTICS,
+    SENSOR_TVOC, SIGNAL_NEW_KEYS,
+    CONF_OUTLIER_FILTER, OUTLIER_FILTER_OFF, OUTLIER_FILTER_HAMPEL,
+)
+from .sensor import async_publish_config
 
 TVOC_UNIT_OPTIONS = ["ppb", "ppm", "mg/m³"]
+INTERVAL_MODE_OPTIONS = [INTERVAL_MODE_FIXED, INTERVAL_MODE_ADAPTIVE]
+RECORDING_MODE_OPTIONS = [RECORDING_MODE_STATES, RECORDING_MODE_STATISTICS]
+OUTLIER_FILTER_OPTIONS = [OUTLIER_FILTER_OFF, OUTLIER_FILTER_HAMPEL]
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -31,9 +41,22 @@ async def async_setup_entry(
     }
 
     async_add_entities([
-        QingpingCGS1TVOCUnitSelect(coordinator, config_entry, mac, name, device_info),
+        QingpingCGS1IntervalModeSelect(coordinator, config_entry, mac, name, device_info),
+        QingpingCGS1RecordingModeSelect(coordinator, config_entry, mac, name, device_info),
+        QingpingCGS1OutlierFilterSelect(coordinator, config_entry, mac, name, device_info),
     ])
 
+    # The TVOC unit only matters once the device reports TVOC
+    @callback
+    def add_tvoc_unit_select(keys):
+        if SENSOR_TVOC in keys:
+            async_add_entities([QingpingCGS1TVOCUnitSelect(coordinator, config_entry, mac, name, device_info)])
+
+    add_tvoc_unit_select(hass.data[DOMAIN][config_entry.entry_id].get("seen_keys", set()))
+    config_entry.async_on_unload(async_dispatcher_connect(
+        hass, SIGNAL_NEW_KEYS.format(config_entry.entry_id), add_tvoc_unit_select
+    ))
+
 class QingpingCGS1TVOCUnitSelect(CoordinatorEntity, SelectEntity):
     """Representation of a Qingping CGS1 TVOC unit select entity."""
 
@@ -74,4 +97,141 @@ class QingpingCGS1TVOCUnitSelect(CoordinatorEntity, SelectEntity):
         """Handle updated data from the coordinator."""
         if CONF_TVOC_UNIT not in self.coordinator.data:
             self.coordinator.data[CONF_TVOC_UNIT] = self._config_entry.data.get(CONF_TVOC_UNIT, TVOC_UNIT_OPTIONS[0])
-        self.async_write_ha_state()
\ No newline at end of file
+        self.async_write_ha_state()
+
+class QingpingCGS1IntervalModeSelect(CoordinatorEntity, SelectEntity):
+    """Representation of a Qingping CGS1 update interval mode select entity."""
+
+    def __init__(self, coordinator, config_entry, mac, name, device_info):
+        """Initialize the select entity."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        self._mac = mac
+        self._attr_name = f"{name} Update Interval Mode"
+        self._attr_unique_id = f"{mac}_interval_mode"
+        self._attr_device_info = device_info
+        self._attr_options = INTERVAL_MODE_OPTIONS
+        self._attr_entity_category = EntityCategory.CONFIG
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the current selected option."""
+        return self.coordinator.data.get(CONF_INTERVAL_MODE, INTERVAL_MODE_FIXED)
+
+    async def async_select_option(self, option: str) -> None:
+        """Update the current selected option."""
+        self.coordinator.data[CONF_INTERVAL_MODE] = option
+        self.async_write_ha_state()
+
+        # Update config entry
+        new_data = dict(self._config_entry.data)
+        new_data[CONF_INTERVAL_MODE] = option
+        self.hass.config_entries.async_update_entry(self._config_entry, data=new_data)
+
+        await self.coordinator.async_request_refresh()
+
+        # Start the controller over and push the interval for the new mode
+        controller = self.hass.data[DOMAIN][self._config_entry.entry_id].get("interval_controller")
+        if controller is not None:
+            controller.reset()
+        await async_publish_config(self.hass, self._config_entry, self._mac, self.coordinator)
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        await super().async_added_to_hass()
+        self._handle_coordinator_update()
+
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if CONF_INTERVAL_MODE not in self.coordinator.data:
+            self.coordinator.data[CONF_INTERVAL_MODE] = self._config_entry.data.get(CONF_INTERVAL_MODE, INTERVAL_MODE_FIXED)
+        self.async_write_ha_state()
+
+class QingpingCGS1RecordingModeSelect(CoordinatorEntity, SelectEntity):
+    """Representation of a Qingping CGS1 recording mode select entity."""
+
+    def __init__(self, coordinator, config_entry, mac, name, device_info):
+        """Initialize the select entity."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        self._mac = mac
+        self._attr_name = f"{name} Recording Mode"
+        self._attr_unique_id = f"{mac}_recording_mode"
+        self._attr_device_info = device_info
+        self._attr_options = RECORDING_MODE_OPTIONS
+        self._attr_entity_category = EntityCategory.CONFIG
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the current selected option."""
+        return self.coordinator.data.get(CONF_RECORDING_MODE, RECORDING_MODE_STATES)
+
+    async def async_select_option(self, option: str) -> None:
+        """Update the current selected option."""
+        self.coordinator.data[CONF_RECORDING_MODE] = option
+        self.async_write_ha_state()
+
+        # Update config entry
+        new_data = dict(self._config_entry.data)
+        new_data[CONF_RECORDING_MODE] = option
+        self.hass.config_entries.async_update_entry(self._config_entry, data=new_data)
+
+        await self.coordinator.async_request_refresh()
+
+        # Measurement sensors report a different state class per mode
+        for sensor in self.hass.data[DOMAIN][self._config_entry.entry_id].get("sensors", []):
+            if hasattr(sensor, 'publish_config') and sensor.hass is not None:
+                sensor.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        await super().async_added_to_hass()
+        self._handle_coordinator_update()
+
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if CONF_RECORDING_MODE not in self.coordinator.data:
+            self.coordinator.data[CONF_RECORDING_MODE] = self._config_entry.data.get(CONF_RECORDING_MODE, RECORDING_MODE_STATES)
+        self.async_write_ha_state()
+
+class QingpingCGS1OutlierFilterSelect(CoordinatorEntity, SelectEntity):
+    """Representation of a Qingping CGS1 outlier filter select entity."""
+
+    def __init__(self, coordinator, config_entry, mac, name, device_info):
+        """Initialize the select entity."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        self._mac = mac
+        self._attr_name = f"{name} Outlier Filter"
+        self._attr_unique_id = f"{mac}_outlier_filter"
+        self._attr_device_info = device_info
+        self._attr_options = OUTLIER_FILTER_OPTIONS
+        self._attr_entity_category = EntityCategory.CONFIG
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the current selected option."""
+        return self.coordinator.data.get(CONF_OUTLIER_FILTER, OUTLIER_FILTER_OFF)
+
+    async def async_select_option(self, option: str) -> None:
+        """Update the current selected option."""
+        self.coordinator.data[CONF_OUTLIER_FILTER] = option
+        self.async_write_ha_state()
+
+        # Update config entry
+        new_data = dict(self._config_entry.data)
+        new_data[CONF_OUTLIER_FILTER] = option
+        self.hass.config_entries.async_update_entry(self._config_entry, data=new_data)
+
+        await self.coordinator.async_request_refresh()
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added to hass."""
+        await super().async_added_to_hass()
+        self._handle_coordinator_update()
+
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if CONF_OUTLIER_FILTER not in self.coordinator.data:
+            self.coordinator.data[CONF_OUTLIER_FILTER] = self._config_entry.data.get(CONF_OUTLIER_FILTER, OUTLIER_FILTER_OFF)
+        self.async_write_ha_state()
@@ -6,14 +6,16 @@ import logging
 from datetime import timedelta
 import time
 import asyncio
+from collections import deque
 
 from homeassistant.components import mqtt
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME, CONF_MAC, UnitOfTemperature
+from homeassistant.const import CONF_NAME, CONF_MAC, UnitOfSoundPressure, UnitOfTemperature, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.exceptions import HomeAssistantError
@@ -21,17 +23,72 @@ from homeassistant.exceptions import HomeAssistantError
 from .const import (
     DOMAIN, MQTT_TOPIC_PREFIX,
     SENSOR_BATTERY, SENSOR_CO2, SENSOR_HUMIDITY, SENSOR_PM10, SENSOR_PM25, SENSOR_TEMPERATURE, SENSOR_TVOC,
+    SENSOR_PM1, SENSOR_NOISE, SENSOR_CO2_PERCENT, SIGNAL_NEW_KEYS,
     PERCENTAGE, PPM, PPB, CONCENTRATION, CONF_TVOC_UNIT,
     CONF_TEMPERATURE_OFFSET, CONF_HUMIDITY_OFFSET, CONF_UPDATE_INTERVAL,
-    ATTR_TYPE, ATTR_UP_ITVL, ATTR_DURATION,
-    DEFAULT_TYPE, DEFAULT_DURATION
+    CONF_INTERVAL_MODE, INTERVAL_MODE_ADAPTIVE,
+    ATTR_TYPE, ATTR_UP_ITVL, ATTR_DURATION, SIGNAL_DEVICE_UPDATED,
+    CONF_MEMBERS, CONF_MEASUREMENTS, DEFAULT_GROUP_MEASUREMENTS, DATA_GROUPS,
+    CONF_RECORDING_MODE, RECORDING_MODE_STATISTICS, DATA_STATISTICS,
+    CONF_OUTLIER_FILTER, OUTLIER_FILTER_HAMPEL,
+    DEFAULT_TYPE, DEFAULT_UPDATE_INTERVAL, DEFAULT_DURATION
 )
+from .filters import HampelFilter
+from .group import GroupAggregator
+from .interval_controller import AdaptiveIntervalController
 
 _LOGGER = logging.getLogger(__name__)
 
 OFFLINE_TIMEOUT = 300  # 5 minutes in seconds
 MQTT_PUBLISH_RETRY_LIMIT = 3
 MQTT_PUBLISH_RETRY_DELAY = 5  # seconds
+BULK_PUBLISH_CONCURRENCY = 4  # config publishes in flight at once during bulk configuration
+BULK_PUBLISH_SPACING = 0.05  # seconds between the start of consecutive bulk publishes
+RECENT_TIMESTAMP_WINDOW = 16  # number of recent report timestamps remembered for duplicate detection
+TIMESTAMP_RESET_THRESHOLD = 3600  # a report this far behind the newest one is treated as a device clock reset
+CLOCK_SKEW_ALPHA = 0.05  # smoothing factor for the per-device clock skew estimate
+CLOCK_STEP_THRESHOLD = 30  # seconds a report's delay may differ from the skew estimate before it counts as late
+GROUP_STATISTICS = ["min", "max", "mean"]
+STATISTICS_STATE_INTERVAL = 300  # seconds between state writes in statistics-only mode
+STATISTICS_STATE_PRECISION = {SENSOR_TEMPERATURE: 1, SENSOR_HUMIDITY: 1, SENSOR_TVOC: 3}
+
+# Unit and device class for each sensorData key. Keys missing here still get a
+# plain measurement sensor once they report a number, so new models work
+# without code changes.
+SENSOR_DESCRIPTIONS = {
+    SENSOR_BATTERY: (PERCENTAGE, SensorDeviceClass.BATTERY),
+    SENSOR_CO2: (PPM, SensorDeviceClass.CO2),
+    SENSOR_CO2_PERCENT: (PERCENTAGE, None),
+    SENSOR_HUMIDITY: (PERCENTAGE, SensorDeviceClass.HUMIDITY),
+    SENSOR_NOISE: (UnitOfSoundPressure.DECIBEL, SensorDeviceClass.SOUND_PRESSURE),
+    SENSOR_PM1: (CONCENTRATION, SensorDeviceClass.PM1),
+    SENSOR_PM10: (CONCENTRATION, SensorDeviceClass.PM10),
+    SENSOR_PM25: (CONCENTRATION, SensorDeviceClass.PM25),
+    SENSOR_TEMPERATURE: (UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE),
+    SENSOR_TVOC: (PPB, SensorDeviceClass.VOLATILE_ORGANIC_COMPOUNDS_PARTS),
+}
+# Smallest deviation from the rolling median the outlier filter may reject, per filtered key
+OUTLIER_MIN_DEVIATION = {SENSOR_CO2: 50, SENSOR_PM1: 10, SENSOR_PM10: 10, SENSOR_PM25: 10}
+# Keys reported in sensorData that are not measurements
+IGNORED_SENSOR_KEYS = {"timestamp"}
+# Keys whose readings have always been reported as whole numbers
+INTEGER_SENSOR_KEYS = {SENSOR_BATTERY, SENSOR_CO2, SENSOR_PM10, SENSOR_PM25}
+
+def is_measurement(key, value):
+    """Return True if a sensorData entry should get a measurement sensor.
+
+    Unknown keys only get one once they report a number, so keys carrying
+    text, lists or other structures never create entities without a state.
+    """
+    if key in SENSOR_DESCRIPTIONS:
+        return True
+    if isinstance(value, dict):
+        value = value.get("value")
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+    return True
 
 async def ensure_mqtt_connected(hass):
     """Ensure MQTT is connected before publishing."""
@@ -41,12 +98,74 @@ async def ensure_mqtt_connected(hass):
         await asyncio.sleep(1)
     return False
 
+async def async_publish_config(hass, config_entry, mac, coordinator):
+    """Publish the configuration message for a device to MQTT."""
+    update_interval = coordinator.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+    if coordinator.data.get(CONF_INTERVAL_MODE) == INTERVAL_MODE_ADAPTIVE:
+        controller = hass.data[DOMAIN][config_entry.entry_id].get("interval_controller")
+        if controller is not None and controller.interval is not None:
+            update_interval = controller.interval
+    payload = {
+        ATTR_TYPE: DEFAULT_TYPE,
+        ATTR_UP_ITVL: f"{int(update_interval)}",
+        ATTR_DURATION: DEFAULT_DURATION
+    }
+    topic = f"{MQTT_TOPIC_PREFIX}/{mac}/down"
+
+    for attempt in range(MQTT_PUBLISH_RETRY_LIMIT):
+        if not await ensure_mqtt_connected(hass):
+            _LOGGER.error("MQTT is not connected after multiple attempts")
+            return False
+
+        try:
+            await mqtt.async_publish(hass, topic, json.dumps(payload))
+            _LOGGER.info(f"Published config to {topic}: {payload}")
+            return True
+        except HomeAssistantError as err:
+            _LOGGER.warning(f"Failed to publish config (attempt {attempt + 1}): {err}")
+            if attempt < MQTT_PUBLISH_RETRY_LIMIT - 1:
+                await asyncio.sleep(MQTT_PUBLISH_RETRY_DELAY)
+            else:
+                _LOGGER.error(f"Failed to publish config after {MQTT_PUBLISH_RETRY_LIMIT} attempts")
+    return False
+
+async def async_publish_configs(hass, targets):
+    """Publish config to many devices through a rate limited pipeline.
+
+    targets is a list of (config_entry, mac, coordinator) tuples. Returns a
+    mapping of MAC to success and publish latency in seconds.
+    """
+    semaphore = asyncio.Semaphore(BULK_PUBLISH_CONCURRENCY)
+    lock = asyncio.Lock()
+    last_start = 0.0
+    results = {}
+
+    async def publish(config_entry, mac, coordinator):
+        nonlocal last_start
+        async with semaphore:
+            # Space out publish starts so the broker sees a steady trickle
+            async with lock:
+                wait = last_start + BULK_PUBLISH_SPACING - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                last_start = time.monotonic()
+            started = time.monotonic()
+            success = await async_publish_config(hass, config_entry, mac, coordinator)
+            results[mac] = {"success": success, "latency": round(time.monotonic() - started, 3)}
+
+    await asyncio.gather(*(publish(*target) for target in targets))
+    return results
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Qingping CGS1 sensor based on a config entry."""
+    if CONF_MEMBERS in config_entry.data:
+        _async_setup_group_entry(hass, config_entry, async_add_entities)
+        return
+
     mac = config_entry.data[CONF_MAC]
     name = config_entry.data[CONF_NAME]
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
@@ -69,29 +188,58 @@ async def async_setup_entry(
     firmware_sensor = QingpingCGS1FirmwareSensor(coordinator, config_entry, mac, name, device_info)
     type_sensor = QingpingCGS1TypeSensor(coordinator, config_entry, mac, name, device_info)
     mac_sensor = QingpingCGS1MACSensor(coordinator, config_entry, mac, name, device_info)
-    battery_state = QingpingCGS1BatteryStateSensor(coordinator, config_entry, mac, name, device_info)
+    latency_sensor = QingpingCGS1LatencySensor(coordinator, config_entry, mac, name, device_info)
 
     sensors = [
         status_sensor,
         firmware_sensor,
         type_sensor,
         mac_sensor,
-        battery_state,
-        QingpingCGS1Sensor(coordinator, config_entry, mac, name, SENSOR_BATTERY, PERCENTAGE, SensorDeviceClass.BATTERY, SensorStateClass.MEASUREMENT, device_info),
-        QingpingCGS1Sensor(coordinator, config_entry, mac, name, SENSOR_CO2, PPM, SensorDeviceClass.CO2, SensorStateClass.MEASUREMENT, device_info),
-        QingpingCGS1Sensor(coordinator, config_entry, mac, name, SENSOR_HUMIDITY, PERCENTAGE, SensorDeviceClass.HUMIDITY, SensorStateClass.MEASUREMENT, device_info),
-        QingpingCGS1Sensor(coordinator, config_entry, mac, name, SENSOR_PM10, CONCENTRATION, SensorDeviceClass.PM10, SensorStateClass.MEASUREMENT, device_info),
-        QingpingCGS1Sensor(coordinator, config_entry, mac, name, SENSOR_PM25, CONCENTRATION, SensorDeviceClass.PM25, SensorStateClass.MEASUREMENT, device_info),
-        QingpingCGS1Sensor(coordinator, config_entry, mac, name, SENSOR_TEMPERATURE, native_temp_unit, SensorDeviceClass.TEMPERATURE, SensorStateClass.MEASUREMENT, device_info),
-        QingpingCGS1Sensor(coordinator, config_entry, mac, name, SENSOR_TVOC, PPB, SensorDeviceClass.VOLATILE_ORGANIC_COMPOUNDS_PARTS, SensorStateClass.MEASUREMENT, device_info),
+        latency_sensor,
     ]
 
     async_add_entities(sensors)
 
+    # Measurement sensors are created the first time the device reports each key
+    measurement_sensors = {}
+    battery_state = None
+
     # Store sensors in hass.data
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN].setdefault(config_entry.entry_id, {})
-    hass.data[DOMAIN][config_entry.entry_id]["sensors"] = sensors
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    entry_data["sensors"] = sensors
+    entry_data.setdefault("seen_keys", set())
+
+    @callback
+    def ensure_measurement_sensors(data):
+        """Create sensors for keys this device has not reported before."""
+        nonlocal battery_state
+        new_entities = []
+        for key, value in data.items():
+            if key in IGNORED_SENSOR_KEYS or key in measurement_sensors or not is_measurement(key, value):
+                continue
+            unit, device_class = SENSOR_DESCRIPTIONS.get(key, (None, None))
+            if key == SENSOR_TEMPERATURE:
+                unit = native_temp_unit
+            sensor = QingpingCGS1Sensor(coordinator, config_entry, mac, name, key, unit, device_class, SensorStateClass.MEASUREMENT, device_info)
+            measurement_sensors[key] = sensor
+            new_entities.append(sensor)
+        battery_data = data.get(SENSOR_BATTERY)
+        if battery_state is None and isinstance(battery_data, dict) and "status" in battery_data:
+            battery_state = QingpingCGS1BatteryStateSensor(coordinator, config_entry, mac, name, device_info)
+            new_entities.append(battery_state)
+        if not new_entities:
+            return
+        sensors.extend(new_entities)
+        async_add_entities(new_entities)
+        new_keys = set(data) - entry_data["seen_keys"]
+        if new_keys:
+            entry_data["seen_keys"].update(new_keys)
+            async_dispatcher_send(hass, SIGNAL_NEW_KEYS.format(config_entry.entry_id), new_keys)
+
+    interval_controller = AdaptiveIntervalController()
+    hass.data[DOMAIN][config_entry.entry_id]["interval_controller"] = interval_controller
 
     @callback
     def message_received(message):
@@ -106,6 +254,13 @@ async def async_setup_entry(
                 _LOGGER.debug("Received message for a different device")
                 return
 
+            # Any message proves the device is online, even one dropped as a duplicate or stale
+            status_sensor.update_received()
+
+            timestamp = payload.get("timestamp")
+            if timestamp is not None and not status_sensor.accept_timestamp(timestamp, payload.get("type")):
+                return
+
             firmware_version = payload.get("version")
             if firmware_version is not None:
                 firmware_sensor.update_version(firmware_version)
@@ -114,9 +269,8 @@ async def async_setup_entry(
             if device_type is not None:
                 type_sensor.update_type(device_type)
 
-            timestamp = payload.get("timestamp")
-            if timestamp is not None:
-                status_sensor.update_timestamp(timestamp)
+            if timestamp is not None and status_sensor.update_clock(timestamp):
+                latency_sensor.update_latency(status_sensor.report_delay, status_sensor.clock_skew)
 
             mac_address = payload.get("mac")
             if mac_address is not None:
@@ -127,27 +281,56 @@ async def async_setup_entry(
                 _LOGGER.error("sensorData is not a non-empty list")
                 return
             if len(sensor_data) == 1:
-                #ignore type 17 sensor data                
                 for data in sensor_data:
+                    ensure_measurement_sensors(data)
                     battery_charging = None
                     if SENSOR_BATTERY in data:
                         battery_data = data[SENSOR_BATTERY]
                         if isinstance(battery_data, dict):
                             battery_charging = battery_data.get("status") == 1
-                    for sensor in sensors[4:]:  # Skip status, firmware, mac and type sensors
-                        if isinstance(sensor, QingpingCGS1BatteryStateSensor):
-                            if battery_charging is not None:
-                                sensor.update_battery_state(battery_charging)
-                        elif sensor._sensor_type in data:
-                            value = data[sensor._sensor_type]
+                            interval_controller.observe_battery(battery_data.get("value"), battery_charging)
+                    if battery_state is not None and battery_charging is not None:
+                        battery_state.update_battery_state(battery_charging)
+                    for key, sensor in measurement_sensors.items():
+                        if key not in data:
+                            continue
+                        value = data[key]
+                        if isinstance(value, dict):
+                            value = value.get("value")
+                        if value is not None:
+                            if sensor.update_from_latest_data(value):
+                                interval_controller.observe(key, value)
+                            if key == SENSOR_BATTERY and battery_charging is not None:
+                                sensor.update_battery_charging(battery_charging)
+
+                async_dispatcher_send(hass, SIGNAL_DEVICE_UPDATED, config_entry.entry_id)
+
+                if coordinator.data.get(CONF_INTERVAL_MODE) == INTERVAL_MODE_ADAPTIVE:
+                    new_interval = interval_controller.evaluate(
+                        coordinator.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+                    )
+                    if new_interval is not None:
+                        _LOGGER.debug("Adaptive update interval for %s is now %s seconds", mac, new_interval)
+                        config_entry.async_create_background_task(
+                            hass,
+                            async_publish_config(hass, config_entry, mac, coordinator),
+                            f"{DOMAIN} adaptive config publish {mac}",
+                        )
+            else:
+                _LOGGER.info("sensorData is type 17")
+                if coordinator.data.get(CONF_RECORDING_MODE) == RECORDING_MODE_STATISTICS:
+                    for data in sensor_data:
+                        history_timestamp = data.get("timestamp")
+                        if isinstance(history_timestamp, dict):
+                            history_timestamp = history_timestamp.get("value")
+                        if history_timestamp is None:
+                            continue
+                        for key, sensor in measurement_sensors.items():
+                            value = data.get(key)
                             if isinstance(value, dict):
                                 value = value.get("value")
                             if value is not None:
-                                sensor.update_from_latest_data(value)
-                                if sensor._sensor_type == SENSOR_BATTERY and battery_charging is not None:
-                                    sensor.update_battery_charging(battery_charging)
-            else:
-                _LOGGER.info("sensorData is type 17")
+                                sensor.add_history_sample(history_timestamp, value)
                 return
 
         except json.JSONDecodeError:
@@ -155,26 +338,70 @@ async def async_setup_entry(
         except Exception as e:
             _LOGGER.error("Error processing MQTT message: %s", str(e))
 
-    await mqtt.async_subscribe(
+    config_entry.async_on_unload(await mqtt.async_subscribe(
         hass, f"{MQTT_TOPIC_PREFIX}/{mac}/up", message_received, 1
-    )
+    ))
 
     # Set up timer for periodic publishing
     async def publish_config_wrapper(*args):
         if await ensure_mqtt_connected(hass):
-            await sensors[5].publish_config()
+            await async_publish_config(hass, config_entry, mac, coordinator)
         else:
-            _LOGGER.error("Failed to connect to MQTT for periodic config publish")
+            _LOGGER.error("Failed to connect to MQTT for config publish")
 
-    hass.data[DOMAIN][config_entry.entry_id]["remove_timer"] = async_track_time_interval(
+    config_entry.async_on_unload(async_track_time_interval(
         hass, publish_config_wrapper, timedelta(seconds=int(DEFAULT_DURATION))
+    ))
+
+    # Publish config in the background so a slow broker does not hold up startup
+    config_entry.async_create_background_task(
+        hass, publish_config_wrapper(), f"{DOMAIN} initial config publish {mac}"
     )
 
-    # Publish config immediately upon setup
-    if await ensure_mqtt_connected(hass):
-        await publish_config_wrapper()
-    else:
-        _LOGGER.error("Failed to connect to MQTT for initial config publish")
+@callback
+def _async_setup_group_entry(hass, config_entry, async_add_entities):
+    """Set up the aggregate sensors of a device group."""
+    name = config_entry.data[CONF_NAME]
+    members = config_entry.data[CONF_MEMBERS]
+    measurements = config_entry.data.get(CONF_MEASUREMENTS, DEFAULT_GROUP_MEASUREMENTS)
+    group = GroupAggregator(name, members, measurements)
+
+    # Seed the group from devices that have already reported
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        for sensor in entry_data.get("sensors", []):
+            if sensor._mac not in group.members:
+                continue
+            if isinstance(sensor, QingpingCGS1StatusSensor):
+                group.set_online(sensor._mac, sensor.native_value == "online")
+            elif isinstance(sensor, QingpingCGS1Sensor):
+                group.update_reading(sensor._mac, sensor._sensor_type, sensor._group_value)
+
+    hass.data[DATA_GROUPS].add(config_entry.entry_id, group)
+
+    device_info = {
+        "identifiers": {(DOMAIN, f"group_{config_entry.entry_id}")},
+        "name": name,
+        "manufacturer": "Qingping",
+        "model": "Group",
+    }
+    native_temp_unit = hass.config.units.temperature_unit
+    units = {
+        SENSOR_CO2: (PPM, SensorDeviceClass.CO2),
+        SENSOR_HUMIDITY: (PERCENTAGE, SensorDeviceClass.HUMIDITY),
+        SENSOR_PM10: (CONCENTRATION, SensorDeviceClass.PM10),
+        SENSOR_PM25: (CONCENTRATION, SensorDeviceClass.PM25),
+        SENSOR_TEMPERATURE: (native_temp_unit, SensorDeviceClass.TEMPERATURE),
+        SENSOR_TVOC: (PPB, SensorDeviceClass.VOLATILE_ORGANIC_COMPOUNDS_PARTS),
+    }
+
+    entities = [QingpingCGS1GroupOnlineSensor(config_entry, group, device_info)]
+    for measurement in measurements:
+        unit, device_class = units[measurement]
+        for statistic in GROUP_STATISTICS:
+            entities.append(QingpingCGS1GroupSensor(
+                config_entry, group, measurement, statistic, unit, device_class, device_info
+            ))
+    async_add_entities(entities)
 
 class QingpingCGS1StatusSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Qingping CGS1 status sensor."""
@@ -190,40 +417,146 @@ class QingpingCGS1StatusSensor(CoordinatorEntity, SensorEntity):
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
         self._attr_native_value = "offline"
         self._last_timestamp = 0
+        self._high_water_timestamp = 0
         self._last_status = "online"
+        self._recent_timestamps = deque(maxlen=RECENT_TIMESTAMP_WINDOW)
+        self._recent_timestamp_set = set()
+        self._duplicates_dropped = 0
+        self._stale_dropped = 0
+        self._step_delay = None
+        self._late_delay = None
+        self._last_received = 0.0
+        self.report_delay = None
+        self.clock_skew = None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the dropped report counters."""
+        return {
+            "duplicates_dropped": self._duplicates_dropped,
+            "stale_dropped": self._stale_dropped,
+        }
 
     @callback
-    def update_timestamp(self, timestamp):
-        """Update the last received timestamp."""
-        self._last_timestamp = int(timestamp)
+    def accept_timestamp(self, timestamp, report_type=None):
+        """Return False if a report with this type and timestamp is a duplicate or stale.
+
+        Only realtime reports move the high-water mark and can be stale; history
+        uploads legitimately carry older timestamps. A realtime report behind the
+        high-water mark is stale only if it also arrived later than the clock
+        skew estimate accounts for. Otherwise, or once a second report confirms
+        the same new delay, the device clock stepped back and the mark is reset.
+        Must be called after update_received.
+        """
+        try:
+            timestamp = int(timestamp)
+        except (TypeError, ValueError):
+            return True
+        report_type = str(report_type) if report_type is not None else None
+        key = (report_type, timestamp)
+
+        if key in self._recent_timestamp_set:
+            self._duplicates_dropped += 1
+            _LOGGER.debug("Dropping duplicate report from %s with timestamp %s", self._mac, timestamp)
+            self.async_write_ha_state()
+            return False
+
+        if report_type == DEFAULT_TYPE:
+            if timestamp < self._high_water_timestamp:
+                delay = self._last_received - timestamp
+                late = (
+                    self.clock_skew is not None
+                    and delay - self.clock_skew > CLOCK_STEP_THRESHOLD
+                    and self._high_water_timestamp - timestamp <= TIMESTAMP_RESET_THRESHOLD
+                )
+                confirmed = self._step_delay is not None and abs(delay - self._step_delay) <= CLOCK_STEP_THRESHOLD
+                if late and not confirmed:
+                    # Either a reordered report or the first one after a clock step;
+                    # the next report tells them apart
+                    self._step_delay = delay
+                    self._stale_dropped += 1
+                    _LOGGER.debug("Dropping stale report from %s with timestamp %s", self._mac, timestamp)
+                    self.async_write_ha_state()
+                    return False
+                _LOGGER.info("Device %s clock moved backwards, resetting report timestamps", self._mac)
+                self._recent_timestamps.clear()
+                self._recent_timestamp_set.clear()
+                self.clock_skew = None
+            self._step_delay = None
+            self._high_water_timestamp = timestamp
+
+        if len(self._recent_timestamps) == self._recent_timestamps.maxlen:
+            self._recent_timestamp_set.discard(self._recent_timestamps[0])
+        self._recent_timestamps.append(key)
+        self._recent_timestamp_set.add(key)
+        return True
+
+    @callback
+    def update_received(self):
+        """Record that a message from the device was received now."""
+        self._last_received = time.time()
         self._update_status()
 
+    @callback
+    def update_clock(self, timestamp):
+        """Update the delay and skew estimates from an accepted report's timestamp.
+
+        Returns False if the timestamp is not a number.
+        """
+        try:
+            self._last_timestamp = int(timestamp)
+        except (TypeError, ValueError):
+            return False
+        # Receive time minus device time is clock skew plus transport delay
+        self.report_delay = self._last_received - self._last_timestamp
+        late_delay, self._late_delay = self._late_delay, None
+        if self.clock_skew is None:
+            self.clock_skew = self.report_delay
+            return True
+        deviation = self.report_delay - self.clock_skew
+        if deviation < -CLOCK_STEP_THRESHOLD:
+            # Transport delay cannot make a report early, so the device clock stepped forward
+            self.clock_skew = self.report_delay
+        elif deviation > CLOCK_STEP_THRESHOLD:
+            # A late report, or the device clock stepped back if the next report agrees
+            if late_delay is not None and abs(self.report_delay - late_delay) <= CLOCK_STEP_THRESHOLD:
+                self.clock_skew = self.report_delay
+            else:
+                self._late_delay = self.report_delay
+        else:
+            self.clock_skew += CLOCK_SKEW_ALPHA * deviation
+        return True
+
     @callback
     def _update_status(self):
-        """Update the status based on the last timestamp."""
-        current_time = int(time.time())
-        new_status = "online" if current_time - self._last_timestamp <= OFFLINE_TIMEOUT else "offline"
+        """Update the status based on when the last report was received."""
+        current_time = time.time()
+        new_status = "online" if current_time - self._last_received <= OFFLINE_TIMEOUT else "offline"
         if self._attr_native_value != new_status:
             self._attr_native_value = new_status
             self.async_write_ha_state()
             # Update other sensors' availability
             sensors = self.hass.data[DOMAIN][self._config_entry.entry_id].get("sensors", [])
             for sensor in sensors:
-                if isinstance(sensor, QingpingCGS1Sensor):
+                if isinstance(sensor, QingpingCGS1Sensor) and sensor.hass is not None:
                     sensor.async_write_ha_state()
+            async_dispatcher_send(self.hass, SIGNAL_DEVICE_UPDATED, self._config_entry.entry_id)
+            groups = self.hass.data.get(DATA_GROUPS)
+            if groups:
+                groups.set_online(self._mac, new_status == "online")
             # Call publish_config when status changes from offline to online
             if self._last_status == "offline" and new_status == "online":
-                asyncio.create_task(self._publish_config_on_status_change())
+                self._config_entry.async_create_background_task(
+                    self.hass,
+                    self._publish_config_on_status_change(),
+                    f"{DOMAIN} config publish on reconnect {self._mac}",
+                )
             
             self._last_status = new_status
 
     async def _publish_config_on_status_change(self):
         """Publish config when status changes from offline to online."""
-        sensors = self.hass.data[DOMAIN][self._config_entry.entry_id].get("sensors", [])
-        for sensor in sensors:
-            if isinstance(sensor, QingpingCGS1Sensor):
-                await sensor.publish_config()
-                break  # We only need to call it once                
+        await async_publish_config(self.hass, self._config_entry, self._mac, self.coordinator)
 
     async def async_added_to_hass(self):
         """Set up a timer to regularly update the status."""
@@ -235,6 +568,14 @@ class QingpingCGS1StatusSensor(CoordinatorEntity, SensorEntity):
         self.async_on_remove(async_track_time_interval(
             self.hass, update_status, timedelta(seconds=60)
         ))
+        self.async_on_remove(self._remove_from_groups)
+
+    @callback
+    def _remove_from_groups(self):
+        """Stop this device contributing to group aggregates."""
+        groups = self.hass.data.get(DATA_GROUPS)
+        if groups:
+            groups.set_online(self._mac, False)
 
 class QingpingCGS1FirmwareSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Qingping CGS1 firmware sensor."""
@@ -294,6 +635,52 @@ class QingpingCGS1BatteryStateSensor(CoordinatorEntity, SensorEntity):
     def update_battery_state(self, status):
         """Update the battery state."""
         self._attr_native_value = "Charging" if status == 1 else "Discharging"
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+class QingpingCGS1LatencySensor(CoordinatorEntity, SensorEntity):
+    """Representation of a Qingping CGS1 report latency sensor."""
+
+    def __init__(self, coordinator, config_entry, mac, name, device_info):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._config_entry = config_entry
+        self._mac = mac
+        self._attr_name = f"{name} Report Latency"
+        self._attr_unique_id = f"{mac}_report_latency"
+        self._attr_device_info = device_info
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_unit_of_measurement = UnitOfTime.SECONDS
+        self._attr_native_value = None
+        self._report_delay = None
+        self._clock_skew = None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the raw report delay and the clock skew estimate."""
+        if self._clock_skew is None:
+            return None
+        return {
+            "report_delay": round(self._report_delay, 1),
+            "clock_skew": round(self._clock_skew, 1),
+        }
+
+    @callback
+    def update_latency(self, delay, clock_skew):
+        """Update the latency, the report delay net of the device's clock skew.
+
+        The raw delay is mostly skew on a drifting clock, so it is only kept as
+        an attribute. The net delay is small and steady, so the state and its
+        attributes are written only when its whole seconds change.
+        """
+        value = round(delay - clock_skew)
+        if value == self._attr_native_value:
+            return
+        self._attr_native_value = value
+        self._report_delay = delay
+        self._clock_skew = clock_skew
         self.async_write_ha_state()
 
 class QingpingCGS1TypeSensor(CoordinatorEntity, SensorEntity):
@@ -325,53 +712,146 @@ class QingpingCGS1Sensor(CoordinatorEntity, SensorEntity):
         self._config_entry = config_entry
         self._mac = mac
         self._sensor_type = sensor_type
-        self._attr_name = f"{name} {sensor_type.capitalize()}"
+        self._attr_name = f"{name} {sensor_type.replace('_', ' ').capitalize()}"
         self._attr_unique_id = f"{mac}_{sensor_type}"
         self._attr_native_unit_of_measurement = unit
         self._attr_device_class = device_class
         self._attr_state_class = state_class
         self._attr_device_info = device_info
         self._battery_charging = False
+        self._window_sum = 0
+        self._window_count = 0
+        self._last_state_write = 0.0
+        self._pending_value = None
+        self._group_value = None
+        self._outlier_filter = None
+        if sensor_type in OUTLIER_MIN_DEVIATION:
+            self._outlier_filter = HampelFilter(OUTLIER_MIN_DEVIATION[sensor_type])
+
+    def _convert_value(self, value):
+        """Apply offsets and unit conversion to a raw reading."""
+        if self._sensor_type == SENSOR_TEMPERATURE:
+            offset = self.coordinator.data.get(CONF_TEMPERATURE_OFFSET, 0)
+            temp_celsius = float(value)
+            if self._attr_native_unit_of_measurement == UnitOfTemperature.FAHRENHEIT:
+                # Convert to Fahrenheit
+                temp_fahrenheit = (temp_celsius * 9/5) + 32
+                return round(float(temp_fahrenheit) + offset, 1)
+            return round(float(temp_celsius) + offset, 1)
+        if self._sensor_type == SENSOR_HUMIDITY:
+            offset = self.coordinator.data.get(CONF_HUMIDITY_OFFSET, 0)
+            return round(float(value) + offset, 1)
+        if self._sensor_type == SENSOR_TVOC:
+            tvoc_unit = self.coordinator.data.get(CONF_TVOC_UNIT, "ppb")
+            tvoc_value = int(value)
+            if tvoc_unit == "ppm":
+                tvoc_value /= 1000
+            elif tvoc_unit == "mg/m³":
+                tvoc_value /= 1000 
+                tvoc_value *= 0.0409 
+                tvoc_value *= 111.1  # Approximate conversion factor
+            self._attr_native_unit_of_measurement = tvoc_unit
+            return round(tvoc_value, 3)
+        if self._sensor_type in INTEGER_SENSOR_KEYS:
+            return int(value)
+        value = float(value)
+        return int(value) if value.is_integer() else round(value, 1)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the number of readings rejected by the outlier filter."""
+        if self._outlier_filter is None:
+            return None
+        return {"outliers_rejected": self._outlier_filter.rejected}
+
+    @property
+    def _statistics_only(self):
+        """Return True if readings go to external statistics instead of states."""
+        return self.coordinator.data.get(CONF_RECORDING_MODE) == RECORDING_MODE_STATISTICS
+
+    @property
+    def state_class(self):
+        """Return the state class, none when statistics are imported directly."""
+        if self._statistics_only:
+            return None
+        return super().state_class
 
     @callback
     def update_from_latest_data(self, value):
-        """Update the sensor with the latest data."""
+        """Update the sensor with the latest data.
+
+        Returns False if the value was invalid or rejected as an outlier.
+        """
+        if self.hass is None:
+            # Created for this report and not added yet, applied in async_added_to_hass
+            self._pending_value = value
+            return True
+        raw_value = value
         try:
-            if self._sensor_type == SENSOR_TEMPERATURE:
-                offset = self.coordinator.data.get(CONF_TEMPERATURE_OFFSET, 0)
-                temp_celsius = float(value)
-                if self._attr_native_unit_of_measurement == UnitOfTemperature.FAHRENHEIT:
-                    # Convert to Fahrenheit
-                    temp_fahrenheit = (temp_celsius * 9/5) + 32
-                    self._attr_native_value = round(float(temp_fahrenheit) + offset, 1)
-                else:
-                    self._attr_native_value = round(float(temp_celsius) + offset, 1)
-            elif self._sensor_type == SENSOR_HUMIDITY:
-                offset = self.coordinator.data.get(CONF_HUMIDITY_OFFSET, 0)
-                self._attr_native_value = round(float(value) + offset, 1)
-            elif self._sensor_type == SENSOR_TVOC:
-                tvoc_unit = self.coordinator.data.get(CONF_TVOC_UNIT, "ppb")
-                tvoc_value = int(value)
-                if tvoc_unit == "ppm":
-                    tvoc_value /= 1000
-                elif tvoc_unit == "mg/m³":
-                    tvoc_value /= 1000 
-                    tvoc_value *= 0.0409 
-                    tvoc_value *= 111.1  # Approximate conversion factor
-                self._attr_native_value = round(tvoc_value, 3)
-                self._attr_native_unit_of_measurement = tvoc_unit
-            else:
-                self._attr_native_value = int(value)
-            self.async_write_ha_state()
-        except ValueError:
+            value = self._convert_value(value)
+        except (TypeError, ValueError):
             _LOGGER.error("Invalid value received for %s: %s", self._sensor_type, value)
+            return False
+
+        if (
+            self._outlier_filter is not None
+            and self.coordinator.data.get(CONF_OUTLIER_FILTER) == OUTLIER_FILTER_HAMPEL
+            and not self._outlier_filter.accept(value)
+        ):
+            _LOGGER.debug("Rejected outlier %s for %s %s", value, self._mac, self._sensor_type)
+            # Keep the state, but publish the new outliers_rejected count
+            self.async_write_ha_state()
+            return False
+
+        # Groups add up TVOC in ppb whatever unit each member displays
+        self._group_value = int(raw_value) if self._sensor_type == SENSOR_TVOC else value
+        groups = self.hass.data.get(DATA_GROUPS)
+        if groups:
+            groups.update_reading(self._mac, self._sensor_type, self._group_value)
+
+        if self._statistics_only:
+            self._add_statistics_sample(time.time(), value)
+            self._window_sum += value
+            self._window_count += 1
+            now = time.monotonic()
+            if self._attr_native_value is not None and now - self._last_state_write < STATISTICS_STATE_INTERVAL:
+                return True
+            value = round(self._window_sum / self._window_count, STATISTICS_STATE_PRECISION.get(self._sensor_type))
+            self._window_sum = 0
+            self._window_count = 0
+            self._last_state_write = now
+
+        self._attr_native_value = value
+        self.async_write_ha_state()
+        return True
+
+    @callback
+    def add_history_sample(self, timestamp, value):
+        """Feed a type 17 history reading into external statistics."""
+        if not self._statistics_only:
+            return
+        try:
+            self._add_statistics_sample(int(timestamp), self._convert_value(value))
+        except (TypeError, ValueError):
+            _LOGGER.error("Invalid history value received for %s: %s", self._sensor_type, value)
+
+    @callback
+    def _add_statistics_sample(self, timestamp, value):
+        """Queue a sample for the next external statistics import."""
+        batcher = self.hass.data.get(DATA_STATISTICS)
+        if batcher is not None:
+            batcher.add(
+                self._mac, self._sensor_type, self.name,
+                self._attr_native_unit_of_measurement, timestamp, value,
+            )
 
     @callback
     def update_battery_charging(self, is_charging):
         """Update the battery charging state."""
         if self._sensor_type == SENSOR_BATTERY:
             self._battery_charging = is_charging
-            self.async_write_ha_state()
+            if self.hass is not None:
+                self.async_write_ha_state()
 
     @property
     def icon(self):
@@ -405,29 +885,7 @@ class QingpingCGS1Sensor(CoordinatorEntity, SensorEntity):
 
     async def publish_config(self):
         """Publish configuration message to MQTT."""
-        update_interval = self.coordinator.data.get(CONF_UPDATE_INTERVAL, 15)
-        payload = {
-            ATTR_TYPE: DEFAULT_TYPE,
-            ATTR_UP_ITVL: f"{int(update_interval)}",
-            ATTR_DURATION: DEFAULT_DURATION
-        }
-        topic = f"{MQTT_TOPIC_PREFIX}/{self._mac}/down"
-
-        for attempt in range(MQTT_PUBLISH_RETRY_LIMIT):
-            if not await ensure_mqtt_connected(self.hass):
-                _LOGGER.error("MQTT is not connected after multiple attempts")
-                return
-
-            try:
-                await mqtt.async_publish(self.hass, topic, json.dumps(payload))
-                _LOGGER.info(f"Published config to {topic}: {payload}")
-                return
-            except HomeAssistantError as err:
-                _LOGGER.warning(f"Failed to publish config (attempt {attempt + 1}): {err}")
-                if attempt < MQTT_PUBLISH_RETRY_LIMIT - 1:
-                    await asyncio.sleep(MQTT_PUBLISH_RETRY_DELAY)
-                else:
-                    _LOGGER.error(f"Failed to publish config after {MQTT_PUBLISH_RETRY_LIMIT} attempts")
+        await async_publish_config(self.hass, self._config_entry, self._mac, self.coordinator)
 
     @property
     def available(self) -> bool:
@@ -439,11 +897,78 @@ class QingpingCGS1Sensor(CoordinatorEntity, SensorEntity):
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
         await super().async_added_to_hass()
+        if self._pending_value is not None:
+            value, self._pending_value = self._pending_value, None
+            self.update_from_latest_data(value)
+
+class QingpingCGS1GroupSensor(SensorEntity):
+    """Representation of a min, max or mean across a group of Qingping devices."""
+
+    _attr_should_poll = False
+
+    def __init__(self, config_entry, group, measurement, statistic, unit, device_class, device_info):
+        """Initialize the sensor."""
+        self._config_entry = config_entry
+        self._group = group
+        self._measurement = measurement
+        self._statistic = statistic
+        self._attr_name = f"{group.name} {measurement.capitalize()} {statistic.capitalize()}"
+        self._attr_unique_id = f"{config_entry.entry_id}_{measurement}_{statistic}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_device_info = device_info
+        self._attr_native_value = self._current_value()
+
+    def _current_value(self):
+        """Read the statistic from the group aggregate."""
+        value = getattr(self._group.measurements[self._measurement], self._statistic)
+        return round(value, 1) if value is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the number of devices contributing a value."""
+        return {"count": self._group.measurements[self._measurement].count}
+
+    @callback
+    def _handle_group_update(self, measurement):
+        """Write the state when the aggregate for this measurement changes."""
+        if measurement is not None and measurement != self._measurement:
+            return
+        value = self._current_value()
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Listen for group updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._group.add_listener(self._handle_group_update))
 
-    async def async_will_remove_from_hass(self) -> None:
-        """Clean up the timer when entity is removed."""
-        if self._config_entry.entry_id in self.hass.data.get(DOMAIN, {}):
-            remove_timer = self.hass.data[DOMAIN][self._config_entry.entry_id].get("remove_timer")
-            if remove_timer:
-                remove_timer()
-        await super().async_will_remove_from_hass()
\ No newline at end of file
+class QingpingCGS1GroupOnlineSensor(SensorEntity):
+    """Representation of the number of online devices in a group."""
+
+    _attr_should_poll = False
+
+    def __init__(self, config_entry, group, device_info):
+        """Initialize the sensor."""
+        self._config_entry = config_entry
+        self._group = group
+        self._attr_name = f"{group.name} Online"
+        self._attr_unique_id = f"{config_entry.entry_id}_online"
+        self._attr_native_unit_of_measurement = "devices"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_device_info = device_info
+        self._attr_native_value = len(group.online)
+
+    @callback
+    def _handle_group_update(self, measurement):
+        """Write the state when the online count changes."""
+        if len(self._group.online) != self._attr_native_value:
+            self._attr_native_value = len(self._group.online)
+            self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Listen for group updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._group.add_listener(self._handle_group_update))
@@ -0,0 +1,196 @@
+"""Batched import of Qingping readings as external long-term statistics."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import logging
+
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STATISTICS_PERIOD = 3600  # external statistics are stored per hour
+STATISTICS_RETAIN_PERIODS = 25  # closed hours kept so late history samples can be merged
+STATISTICS_FLUSH_INTERVAL = timedelta(minutes=5)
+STATISTICS_SAVE_DELAY = 60  # seconds
+STORAGE_KEY = f"{DOMAIN}.statistics"
+STORAGE_VERSION = 1
+
+
+def statistic_id(mac, sensor_type):
+    """Return the external statistic id for a device measurement."""
+    return f"{DOMAIN}:{mac.lower()}_{sensor_type}"
+
+
+class StatisticsBatcher:
+    """Accumulate hourly mean, min and max per statistic and import them in batches.
+
+    Samples only update in-memory buckets. A timer imports every closed hour
+    that received samples since the last import, one recorder call per
+    statistic. Buckets for recent hours are kept so late samples, such as
+    type 17 history reports, are merged and the hour re-imported whole.
+
+    The open hour is imported as well when the batcher stops or Home
+    Assistant shuts down. Buckets, pending hours and the newest imported hour
+    per statistic are saved, so after a restart samples for a saved hour are
+    merged into it and samples for an older imported hour, which would
+    replace the stored row with a partial one, are skipped. The file is only
+    written when something changed since it was last saved.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the batcher."""
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._metadata = {}
+        self._buckets = {}
+        self._dirty = {}
+        self._imported = {}
+        self._changed = False
+        self._unsub = None
+        self._unsub_final_write = None
+
+    async def async_start(self):
+        """Restore saved buckets and start the periodic import."""
+        if self._unsub is not None:
+            return
+        self._unsub = async_track_time_interval(self._hass, self._async_flush, STATISTICS_FLUSH_INTERVAL)
+        self._unsub_final_write = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+        )
+        stored = await self._store.async_load() or {}
+        for key, start in stored.get("imported", {}).items():
+            self._imported[key] = max(start, self._imported.get(key, start))
+        for key, buckets in stored.get("buckets", {}).items():
+            current = self._buckets.setdefault(key, {})
+            for start, saved in buckets.items():
+                bucket = current.get(int(start))
+                if bucket is None:
+                    current[int(start)] = saved
+                else:
+                    # Samples that arrived while loading are merged into the saved hour
+                    bucket[0] += saved[0]
+                    bucket[1] += saved[1]
+                    bucket[2] = min(bucket[2], saved[2])
+                    bucket[3] = max(bucket[3], saved[3])
+        for key, starts in stored.get("dirty", {}).items():
+            starts = [start for start in starts if start in self._buckets.get(key, {})]
+            if starts:
+                self._metadata.setdefault(key, stored["metadata"][key])
+                self._dirty.setdefault(key, set()).update(starts)
+
+    async def async_stop(self):
+        """Import every changed hour, including the open one, and stop the periodic import."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        self.flush(include_current=True)
+        if self._changed:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _async_final_write(self, event: Event) -> None:
+        """Import the open hour before the recorder shuts down."""
+        self._unsub_final_write = None
+        # Runs as a callback, so the import is queued ahead of the recorder's stop task
+        self.flush(include_current=True)
+        if self._changed:
+            self._hass.async_create_task(self._store.async_save(self._data_to_save()))
+
+    @callback
+    def add(self, mac, sensor_type, name, unit, timestamp, value):
+        """Record a sample taken at a UNIX timestamp."""
+        key = statistic_id(mac, sensor_type)
+        start = int(timestamp) - int(timestamp) % STATISTICS_PERIOD
+        buckets = self._buckets.setdefault(key, {})
+        bucket = buckets.get(start)
+        if bucket is None:
+            if start <= self._imported.get(key, -1):
+                # The hour was imported and is no longer held, so a bucket of
+                # only these samples would replace the full hour
+                return
+            buckets[start] = [1, value, value, value]
+        else:
+            bucket[0] += 1
+            bucket[1] += value
+            bucket[2] = min(bucket[2], value)
+            bucket[3] = max(bucket[3], value)
+        self._metadata[key] = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": name,
+            "source": DOMAIN,
+            "statistic_id": key,
+            "unit_of_measurement": unit,
+        }
+        self._dirty.setdefault(key, set()).add(start)
+        self._changed = True
+
+    async def _async_flush(self, *_):
+        """Import closed hours on the timer."""
+        self.flush()
+
+    @callback
+    def flush(self, now=None, include_current=False):
+        """Import every closed hour that changed since the last import.
+
+        With include_current the open hour is imported too, as it stands.
+        """
+        if "recorder" not in self._hass.config.components or not (self._dirty or self._buckets):
+            return
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        current = int(now) - int(now) % STATISTICS_PERIOD
+        oldest = current - STATISTICS_RETAIN_PERIODS * STATISTICS_PERIOD
+
+        for key, starts in list(self._dirty.items()):
+            buckets = self._buckets[key]
+            ready = sorted(start for start in starts if include_current or start < current)
+            if ready:
+                rows = []
+                for start in ready:
+                    count, total, minimum, maximum = buckets[start]
+                    rows.append({
+                        "start": datetime.fromtimestamp(start, timezone.utc),
+                        "mean": total / count,
+                        "min": minimum,
+                        "max": maximum,
+                    })
+                async_add_external_statistics(self._hass, self._metadata[key], rows)
+                _LOGGER.debug("Imported %s hourly statistics rows for %s", len(rows), key)
+                self._imported[key] = max(ready[-1], self._imported.get(key, ready[-1]))
+                self._changed = True
+            starts.difference_update(ready)
+            if not starts:
+                del self._dirty[key]
+
+        for key, buckets in list(self._buckets.items()):
+            for start in [start for start in buckets if start < oldest]:
+                del buckets[start]
+                self._changed = True
+            if not buckets:
+                del self._buckets[key]
+        if self._changed:
+            self._store.async_delay_save(self._data_to_save, STATISTICS_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self):
+        """Return the buckets, pending hours and imported hours to persist."""
+        self._changed = False
+        return {
+            "imported": dict(self._imported),
+            "metadata": {key: self._metadata[key] for key in self._dirty},
+            "dirty": {key: sorted(starts) for key, starts in self._dirty.items()},
+            "buckets": {
+                key: {str(start): list(bucket) for start, bucket in buckets.items()}
+                for key, buckets in self._buckets.items()
+                if buckets
+            },
+        }
@@ -0,0 +1,91 @@
+"""Capture of raw Qingping MQTT traffic.
+
+Traffic files start with a short magic header followed by one record per
+message: a little-endian float64 receive time, the topic length (uint16),
+the payload length (uint32), then the topic and the raw payload bytes.
+
+This module does not depend on Home Assistant so captures can be read on a
+machine without a running instance. tests/replay.py replays them.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import struct
+import threading
+import time
+
+TRAFFIC_MAGIC = b"QPTRAFFIC1\n"
+_RECORD_HEADER = struct.Struct("<dHI")
+
+
+@dataclass
+class TrafficRecord:
+    """A single captured MQTT message."""
+
+    timestamp: float
+    topic: str
+    payload: bytes
+
+
+def encode_record(record: TrafficRecord) -> bytes:
+    """Return the on-disk encoding of a record."""
+    topic = record.topic.encode("utf-8")
+    return _RECORD_HEADER.pack(record.timestamp, len(topic), len(record.payload)) + topic + record.payload
+
+
+def read_traffic(path):
+    """Yield the records stored in a traffic file."""
+    with open(path, "rb") as file:
+        if file.read(len(TRAFFIC_MAGIC)) != TRAFFIC_MAGIC:
+            raise ValueError(f"{path} is not a Qingping traffic capture")
+        while True:
+            header = file.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            timestamp, topic_length, payload_length = _RECORD_HEADER.unpack(header)
+            topic = file.read(topic_length).decode("utf-8")
+            payload = file.read(payload_length)
+            if len(payload) < payload_length:
+                return  # Truncated final record from an interrupted capture
+            yield TrafficRecord(timestamp, topic, payload)
+
+
+class TrafficWriter:
+    """Buffer captured messages and append them to a traffic file.
+
+    add() only touches memory so it is safe to call from the event loop;
+    flush() does the file I/O and belongs in an executor.
+    """
+
+    def __init__(self, path):
+        """Initialize the writer."""
+        self.path = path
+        self.count = 0
+        self._buffer = []
+        self._started = False
+        # _lock guards the buffer and is only held briefly; _write_lock orders the file writes
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def add(self, topic, payload, timestamp=None):
+        """Queue a message for writing."""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        if timestamp is None:
+            timestamp = time.time()
+        record = encode_record(TrafficRecord(timestamp, topic, payload))
+        with self._lock:
+            self._buffer.append(record)
+            self.count += 1
+
+    def flush(self):
+        """Write queued messages to disk."""
+        with self._write_lock:
+            with self._lock:
+                buffer, self._buffer = self._buffer, []
+            mode = "ab" if self._started else "wb"
+            with open(self.path, mode) as file:
+                if not self._started:
+                    file.write(TRAFFIC_MAGIC)
+                    self._started = True
+                file.writelines(buffer)
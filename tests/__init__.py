@@ -0,0 +1 @@
+"""Tests for the Qingping CGS1 integration."""
@@ -0,0 +1,39 @@
+"""Fixtures for Qingping CGS1 tests."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from custom_components.qingping_cgs1.traffic import TrafficRecord
+
+from .replay import ReplayMQTT, mock_device_entry, replay_dependencies
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    yield
+
+
+@pytest.fixture
+def replay_mqtt():
+    """Return the MQTT stand-in the integration talks to."""
+    return ReplayMQTT()
+
+
+@pytest.fixture
+async def setup_dependencies(hass, replay_mqtt):
+    """Set up HTTP for the fleet API and route MQTT calls to replay_mqtt."""
+    async with replay_dependencies(hass, replay_mqtt):
+        yield replay_mqtt
+
+
+def realtime_report(mac: str, timestamp: int, **readings) -> TrafficRecord:
+    """Return a captured type 12 report; dict readings are passed through as is."""
+    sensor_data = {"timestamp": {"value": timestamp}}
+    sensor_data.update({
+        key: value if isinstance(value, dict) else {"value": value} for key, value in readings.items()
+    })
+    payload = {"type": "12", "mac": mac, "timestamp": timestamp, "sensorData": [sensor_data]}
+    return TrafficRecord(timestamp, f"qingping/{mac}/up", json.dumps(payload).encode())
@@ -0,0 +1,197 @@
+"""Offline replay of Qingping MQTT traffic captures.
+
+ReplayMQTT stands in for the Home Assistant MQTT component so captures made
+with the start_traffic_capture service can be fed through the integration in
+a test instance. Run this module to replay a capture from the command line:
+
+    python -m tests.replay qingping_traffic.bin --speed 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from unittest.mock import patch
+
+from homeassistant.const import CONF_MAC, CONF_NAME, EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.loader import DATA_CUSTOM_COMPONENTS
+from homeassistant.setup import async_setup_component
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+from custom_components.qingping_cgs1.const import DOMAIN
+from custom_components.qingping_cgs1.traffic import TrafficRecord, read_traffic
+
+
+@dataclass
+class ReplayMessage:
+    """MQTT message delivered by the replay stand-in.
+
+    Mirrors the attributes of the messages Home Assistant's MQTT component
+    hands to subscription callbacks.
+    """
+
+    topic: str
+    payload: str | bytes
+    qos: int
+    retain: bool
+    subscribed_topic: str
+    timestamp: float
+
+
+def topic_matches(subscription, topic):
+    """Return True if an MQTT topic matches a subscription filter."""
+    filter_parts = subscription.split("/")
+    topic_parts = topic.split("/")
+    for index, part in enumerate(filter_parts):
+        if part == "#":
+            return True
+        if index >= len(topic_parts):
+            return False
+        if part != "+" and part != topic_parts[index]:
+            return False
+    return len(filter_parts) == len(topic_parts)
+
+
+class ReplayMQTT:
+    """Local stand-in for the Home Assistant MQTT component.
+
+    Provides the is_connected, async_subscribe and async_publish calls the
+    integration makes, so a module's mqtt reference can be pointed at an
+    instance of this class and fed from a capture file. Published messages
+    are kept in ``published`` for inspection.
+    """
+
+    def __init__(self):
+        """Initialize the stand-in."""
+        self._subscriptions = []
+        self.published = []
+
+    def is_connected(self, hass):
+        """Report the broker as always connected."""
+        return True
+
+    async def async_subscribe(self, hass, topic, msg_callback, qos=0, encoding="utf-8"):
+        """Register a callback and return its unsubscribe function."""
+        subscription = (topic, msg_callback, qos, encoding)
+        self._subscriptions.append(subscription)
+
+        def unsubscribe():
+            self._subscriptions.remove(subscription)
+
+        return unsubscribe
+
+    async def async_publish(self, hass, topic, payload, qos=0, retain=False, encoding="utf-8"):
+        """Record a published message."""
+        self.published.append((topic, payload))
+
+    @property
+    def subscription_count(self):
+        """Return the number of active subscriptions."""
+        return len(self._subscriptions)
+
+    def deliver(self, record: TrafficRecord):
+        """Hand a record to every matching subscriber."""
+        for topic, msg_callback, qos, encoding in list(self._subscriptions):
+            if not topic_matches(topic, record.topic):
+                continue
+            payload = record.payload
+            if encoding is not None:
+                payload = payload.decode(encoding, errors="replace")
+            msg_callback(ReplayMessage(record.topic, payload, qos, False, topic, record.timestamp))
+
+    async def async_replay(self, path, speed=1.0):
+        """Deliver a capture to subscribers, returning the number of records.
+
+        A speed of 1 keeps the original timing, 10 plays ten times faster and
+        0 delivers everything without waiting.
+        """
+        count = 0
+        previous = None
+        for record in read_traffic(path):
+            if speed > 0 and previous is not None and record.timestamp > previous:
+                await asyncio.sleep((record.timestamp - previous) / speed)
+            previous = record.timestamp
+            self.deliver(record)
+            count += 1
+        return count
+
+
+def mock_device_entry(index: int, mac: str | None = None, **settings) -> MockConfigEntry:
+    """Return a device config entry, with a MAC derived from index unless given."""
+    mac = mac or f"AABBCC{index:06X}"
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title=f"Device {index}",
+        unique_id=mac,
+        data={CONF_MAC: mac, CONF_NAME: f"Device {index}", **settings},
+    )
+
+
+@asynccontextmanager
+async def replay_dependencies(hass: HomeAssistant, mqtt: ReplayMQTT):
+    """Set up HTTP for the fleet API and route the integration's MQTT calls to mqtt."""
+    assert await async_setup_component(hass, "http", {})
+    assert await async_setup_component(hass, "websocket_api", {})
+    # The stand-in replaces the broker, so only mark the component as loaded
+    hass.config.components.add("mqtt")
+    with patch("custom_components.qingping_cgs1.mqtt", mqtt), patch(
+        "custom_components.qingping_cgs1.sensor.mqtt", mqtt
+    ):
+        yield
+
+
+async def async_replay_capture(hass: HomeAssistant, mqtt: ReplayMQTT, path, speed=0) -> int:
+    """Set up one device per MAC in a capture and replay it, returning the number of records."""
+    macs = sorted({
+        record.topic.split("/")[1] for record in read_traffic(path) if record.topic.endswith("/up")
+    })
+    for index, mac in enumerate(macs):
+        mock_device_entry(index, mac).add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    count = await mqtt.async_replay(path, speed)
+    await hass.async_block_till_done()
+    return count
+
+
+async def _async_main(path, speed):
+    """Replay a capture in a test instance, printing sensor states as they change."""
+    mqtt = ReplayMQTT()
+    async with async_test_home_assistant() as hass:
+        hass.data.pop(DATA_CUSTOM_COMPONENTS)
+
+        @callback
+        def _state_changed(event: Event) -> None:
+            new_state = event.data["new_state"]
+            if new_state is not None and new_state.domain == "sensor":
+                print(f"{new_state.last_updated.isoformat()} {new_state.entity_id}: {new_state.state}")
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, _state_changed)
+        async with replay_dependencies(hass, mqtt):
+            count = await async_replay_capture(hass, mqtt, path, speed)
+            print(f"Replayed {count} messages")
+            for topic, payload in mqtt.published:
+                print(f"Published to {topic}: {payload}")
+        await hass.async_stop(force=True)
+
+
+def main():
+    """Parse the command line and run the replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="traffic capture written by start_traffic_capture")
+    parser.add_argument(
+        "--speed", type=float, default=1.0,
+        help="1 keeps the original timing, 10 plays ten times faster, 0 as fast as possible",
+    )
+    args = parser.parse_args()
+    if args.speed < 0:
+        parser.error("--speed cannot be negative")
+    asyncio.run(_async_main(args.path, args.speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Tests for the fleet snapshot API."""
+from __future__ import annotations
+
+from http import HTTPStatus
+
+from homeassistant.setup import async_setup_component
+
+from custom_components.qingping_cgs1.const import DOMAIN
+from custom_components.qingping_cgs1.fleet import SNAPSHOT_FIELDS, device_snapshot, fleet_snapshot
+
+from .conftest import mock_device_entry, realtime_report
+
+
+async def test_snapshot_and_deltas_share_fields(hass, setup_dependencies):
+    """Newer readings appear in snapshots, and unknown keys in neither snapshots nor deltas."""
+    mqtt = setup_dependencies
+    entry = mock_device_entry(0)
+    entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    mqtt.deliver(realtime_report(entry.data["mac"], 1_700_000_000, pm1=4, noise=41, radon=12))
+    await hass.async_block_till_done()
+
+    snapshot = fleet_snapshot(hass)
+    assert list(snapshot) == SNAPSHOT_FIELDS
+    assert snapshot["pm1"] == [4]
+    assert snapshot["noise"] == [41]
+    assert list(device_snapshot(hass.data[DOMAIN][entry.entry_id])) == SNAPSHOT_FIELDS
+
+
+async def test_non_scalar_value_does_not_abort_report(hass, setup_dependencies):
+    """A list under an unknown key is rejected without dropping the other readings."""
+    mqtt = setup_dependencies
+    entry = mock_device_entry(0)
+    entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    mqtt.deliver(realtime_report(entry.data["mac"], 1_700_000_000, radon=12, co2=600))
+    await hass.async_block_till_done()
+    mqtt.deliver(realtime_report(entry.data["mac"], 1_700_000_060, radon=[1, 2], co2=650))
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.device_0_co2").state == "650"
+
+
+async def test_snapshot_view(hass, setup_dependencies, hass_client):
+    """The HTTP view returns the same columns as the websocket snapshot."""
+    mqtt = setup_dependencies
+    entry = mock_device_entry(0)
+    entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    mqtt.deliver(realtime_report(entry.data["mac"], 1_700_000_000, co2=600, pm25=5))
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+    response = await client.get(f"/api/{DOMAIN}/snapshot")
+
+    assert response.status == HTTPStatus.OK
+    snapshot = await response.json()
+    assert list(snapshot) == SNAPSHOT_FIELDS
+    assert snapshot["mac"] == [entry.data["mac"]]
+    assert snapshot["co2"] == [600]
+    assert snapshot["status"] == ["online"]
+
+
+async def test_subscribe_sends_only_changed_fields(hass, setup_dependencies, hass_ws_client):
+    """After the full snapshot, subscribers receive only the fields that changed."""
+    mqtt = setup_dependencies
+    entry = mock_device_entry(0)
+    entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    mac = entry.data["mac"]
+    mqtt.deliver(realtime_report(mac, 1_700_000_000, co2=600, pm25=5))
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 1, "type": f"{DOMAIN}/subscribe_snapshot"})
+    assert (await client.receive_json())["success"]
+    snapshot = (await client.receive_json())["event"]["snapshot"]
+    assert snapshot["co2"] == [600]
+    assert snapshot["pm25"] == [5]
+
+    # A report repeating every value sends nothing, so the next event is the change
+    mqtt.deliver(realtime_report(mac, 1_700_000_060, co2=600, pm25=5))
+    await hass.async_block_till_done()
+    mqtt.deliver(realtime_report(mac, 1_700_000_120, co2=650, pm25=5))
+    await hass.async_block_till_done()
+
+    event = (await client.receive_json())["event"]
+    assert event == {"mac": mac, "changes": {"co2": 650}}
@@ -0,0 +1,66 @@
+"""Tests for device groups."""
+from __future__ import annotations
+
+from homeassistant.const import CONF_NAME
+from homeassistant.setup import async_setup_component
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.qingping_cgs1.const import (
+    CONF_MEASUREMENTS, CONF_MEMBERS, CONF_TVOC_UNIT, DOMAIN, SENSOR_TVOC,
+)
+from custom_components.qingping_cgs1.group import HEAP_COMPACT_FACTOR, MeasurementAggregate
+
+from .conftest import mock_device_entry, realtime_report
+
+
+def test_aggregate_heaps_stay_bounded():
+    """A steadily rising value does not leave stale entries in either heap."""
+    aggregate = MeasurementAggregate()
+    for value in range(10_000):
+        aggregate.update("a", float(value))
+        assert aggregate.min == aggregate.max == value
+
+    limit = HEAP_COMPACT_FACTOR * aggregate.count + 8
+    assert len(aggregate._min_heap) <= limit
+    assert len(aggregate._max_heap) <= limit
+
+
+def test_aggregate_statistics():
+    """Min, max and mean follow updates and removals."""
+    aggregate = MeasurementAggregate()
+    aggregate.update("a", 400.0)
+    aggregate.update("b", 800.0)
+    aggregate.update("a", 500.0)
+    assert (aggregate.min, aggregate.max, aggregate.mean, aggregate.count) == (500.0, 800.0, 650.0, 2)
+
+    aggregate.remove("b")
+    assert (aggregate.min, aggregate.max, aggregate.mean, aggregate.count) == (500.0, 500.0, 500.0, 1)
+
+
+async def test_group_tvoc_ignores_member_units(hass, setup_dependencies):
+    """TVOC is averaged in ppb even when members display other units."""
+    mqtt = setup_dependencies
+    devices = [mock_device_entry(0), mock_device_entry(1, **{CONF_TVOC_UNIT: "mg/m³"})]
+    group = MockConfigEntry(
+        domain=DOMAIN,
+        title="Office",
+        unique_id="group_Office",
+        data={
+            CONF_NAME: "Office",
+            CONF_MEMBERS: [device.data["mac"] for device in devices],
+            CONF_MEASUREMENTS: [SENSOR_TVOC],
+        },
+    )
+    for entry in (*devices, group):
+        entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    mqtt.deliver(realtime_report(devices[0].data["mac"], 1_700_000_000, tvoc=100))
+    mqtt.deliver(realtime_report(devices[1].data["mac"], 1_700_000_000, tvoc=300))
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.device_1_tvoc").attributes["unit_of_measurement"] == "mg/m³"
+    assert hass.states.get("sensor.office_tvoc_mean").state == "200.0"
+    assert hass.states.get("sensor.office_tvoc_max").state == "300.0"
@@ -0,0 +1,38 @@
+"""Tests for the adaptive interval controller."""
+from __future__ import annotations
+
+from custom_components.qingping_cgs1.const import ADAPTIVE_MAX_INTERVAL, SENSOR_CO2
+from custom_components.qingping_cgs1.interval_controller import MIN_CHANGE_PERIOD, AdaptiveIntervalController
+
+
+def test_first_evaluation_keeps_base_interval():
+    """The interval sent by the setup publish is not published again."""
+    controller = AdaptiveIntervalController()
+    assert controller.evaluate(60, now=0) is None
+    assert controller.interval == 60
+
+    controller.reset()
+    assert controller.evaluate(60, now=1000) is None
+
+
+def test_volatile_readings_shorten_interval():
+    """Fast changing CO2 switches to the minimum interval once the hold-off has passed."""
+    controller = AdaptiveIntervalController()
+    assert controller.evaluate(60, now=0) is None
+    for index in range(6):
+        controller.observe(SENSOR_CO2, 400 + (index % 2) * 200)
+
+    assert controller.evaluate(60, now=MIN_CHANGE_PERIOD - 1) is None
+    assert controller.evaluate(60, now=MIN_CHANGE_PERIOD) == 15
+
+
+def test_invalid_battery_level_is_ignored():
+    """A non-numeric battery level keeps the last valid one."""
+    controller = AdaptiveIntervalController()
+    for index in range(6):
+        controller.observe(SENSOR_CO2, 400 + (index % 2) * 200)
+    controller.observe_battery(10, False)
+    controller.observe_battery("low", False)
+    controller.observe_battery({"value": 5}, False)
+    # Volatile readings would pick the minimum, but the stored low battery level wins
+    assert controller.target_interval(60) == ADAPTIVE_MAX_INTERVAL
@@ -0,0 +1,75 @@
+"""Reload stress test for Qingping CGS1 entries."""
+from __future__ import annotations
+
+import gc
+
+from homeassistant.helpers.dispatcher import DATA_DISPATCHER
+from homeassistant.setup import async_setup_component
+
+from custom_components.qingping_cgs1.const import DOMAIN
+from custom_components.qingping_cgs1.sensor import QingpingCGS1Sensor, QingpingCGS1StatusSensor
+
+from .conftest import mock_device_entry, realtime_report
+
+RELOAD_COUNT = 1000
+
+
+def _resource_counts(hass, mqtt):
+    """Count everything an entry registers while loaded."""
+    dispatchers = hass.data.get(DATA_DISPATCHER, {})
+    gc.collect()
+    return {
+        "mqtt_subscriptions": mqtt.subscription_count,
+        "dispatcher_signals": len(dispatchers),
+        "dispatcher_listeners": sum(len(targets) for targets in dispatchers.values()),
+        "hass_data": len(hass.data),
+        "domain_data": len(hass.data[DOMAIN]),
+        "entry_data": sum(len(entry_data) for entry_data in hass.data[DOMAIN].values()),
+        "states": len(hass.states.async_all()),
+        "sensor_objects": sum(
+            isinstance(obj, (QingpingCGS1Sensor, QingpingCGS1StatusSensor)) for obj in gc.get_objects()
+        ),
+    }
+
+
+async def test_reload_does_not_leak(hass, setup_dependencies):
+    """Reload an entry many times and check nothing accumulates."""
+    mqtt = setup_dependencies
+    entries = [mock_device_entry(index) for index in range(2)]
+    for entry in entries:
+        entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    entry = entries[0]
+    mac = entry.data["mac"]
+    timestamp = 1_700_000_000
+
+    async def reload_and_report():
+        nonlocal timestamp
+        assert await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        timestamp += 60
+        mqtt.deliver(realtime_report(
+            mac, timestamp, co2=600, pm25=5, temperature=21.5, battery={"value": 90, "status": 1}
+        ))
+        await hass.async_block_till_done()
+
+    # The first report creates the lazy measurement entities
+    await reload_and_report()
+    baseline = _resource_counts(hass, mqtt)
+    baseline_listeners = hass.bus.async_listeners()
+    assert baseline["mqtt_subscriptions"] == len(entries)
+
+    for _ in range(RELOAD_COUNT):
+        await reload_and_report()
+
+    assert _resource_counts(hass, mqtt) == baseline
+    # Registry stores only hold a final write listener while a save is pending,
+    # so bus listeners may drop below the baseline but must never grow
+    for event_type, count in hass.bus.async_listeners().items():
+        assert count <= baseline_listeners.get(event_type, 0), event_type
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    assert mqtt.subscription_count == 0
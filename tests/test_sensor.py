@@ -0,0 +1,163 @@
+"""Tests for device report handling."""
+from __future__ import annotations
+
+from datetime import timedelta
+import time
+
+from homeassistant.setup import async_setup_component
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.qingping_cgs1.const import CONF_OUTLIER_FILTER, DOMAIN, OUTLIER_FILTER_HAMPEL
+
+from .conftest import mock_device_entry, realtime_report
+
+START = 1_700_000_000
+
+
+async def _setup_device(hass, **settings):
+    """Set up one device entry and return its MAC."""
+    entry = mock_device_entry(0, **settings)
+    entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    return entry.data["mac"]
+
+
+async def test_rejected_outlier_updates_count(hass, setup_dependencies):
+    """A rejected reading keeps the state but publishes the rejection count."""
+    mqtt = setup_dependencies
+    mac = await _setup_device(hass, **{CONF_OUTLIER_FILTER: OUTLIER_FILTER_HAMPEL})
+
+    for index in range(6):
+        mqtt.deliver(realtime_report(mac, START + index * 60, co2=600 + index))
+        await hass.async_block_till_done()
+    mqtt.deliver(realtime_report(mac, START + 360, co2=3000))
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.device_0_co2")
+    assert state.state == "605"
+    assert state.attributes["outliers_rejected"] == 1
+
+
+async def _deliver(hass, mqtt, record):
+    """Deliver a captured message and let the state machine settle."""
+    mqtt.deliver(record)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_clock_correction_keeps_reports(hass, setup_dependencies, freezer):
+    """Reports after a device clock is corrected backwards are accepted, not dropped as stale."""
+    mqtt = setup_dependencies
+    mac = await _setup_device(hass)
+
+    # The device clock runs 30 minutes ahead
+    for minute in range(3):
+        await _deliver(hass, mqtt, realtime_report(mac, int(time.time()) + 1800, co2=600 + minute))
+        freezer.tick(timedelta(minutes=1))
+
+    # NTP corrects it; only the first report is held back until the next one confirms the step
+    for minute in range(10):
+        await _deliver(hass, mqtt, realtime_report(mac, int(time.time()), co2=700 + minute))
+        freezer.tick(timedelta(minutes=1))
+
+    assert hass.states.get("sensor.device_0_co2").state == "709"
+    status = hass.states.get("sensor.device_0_status")
+    assert status.state == "online"
+    assert status.attributes["stale_dropped"] == 1
+
+
+async def test_reordered_report_is_dropped(hass, setup_dependencies, freezer):
+    """A realtime report that arrives after a newer one does not overwrite it."""
+    mqtt = setup_dependencies
+    mac = await _setup_device(hass)
+    now = int(time.time())
+
+    await _deliver(hass, mqtt, realtime_report(mac, now, co2=600))
+    freezer.tick(timedelta(seconds=60))
+    await _deliver(hass, mqtt, realtime_report(mac, now + 60, co2=610))
+    freezer.tick(timedelta(seconds=30))
+    await _deliver(hass, mqtt, realtime_report(mac, now + 30, co2=999))
+    assert hass.states.get("sensor.device_0_co2").state == "610"
+
+    freezer.tick(timedelta(seconds=30))
+    await _deliver(hass, mqtt, realtime_report(mac, now + 120, co2=620))
+    assert hass.states.get("sensor.device_0_co2").state == "620"
+    assert hass.states.get("sensor.device_0_status").attributes["stale_dropped"] == 1
+
+
+async def test_duplicate_and_history_reports(hass, setup_dependencies):
+    """A redelivered report is dropped, while a history upload with the same timestamp gets through."""
+    mqtt = setup_dependencies
+    mac = await _setup_device(hass)
+    now = int(time.time())
+
+    await _deliver(hass, mqtt, realtime_report(mac, now, co2=600))
+    await _deliver(hass, mqtt, realtime_report(mac, now, co2=600))
+    history = realtime_report(mac, now, co2=650)
+    history.payload = history.payload.replace(b'"type": "12"', b'"type": "17"')
+    await _deliver(hass, mqtt, history)
+
+    status = hass.states.get("sensor.device_0_status")
+    assert status.attributes["duplicates_dropped"] == 1
+    assert status.attributes["stale_dropped"] == 0
+    assert hass.states.get("sensor.device_0_report_type").state == "17"
+
+
+async def test_latency_is_net_of_clock_skew(hass, setup_dependencies, freezer):
+    """A device clock that runs behind shows as skew, not as latency."""
+    mqtt = setup_dependencies
+    mac = await _setup_device(hass)
+
+    for minute in range(5):
+        mqtt.deliver(realtime_report(mac, int(time.time()) - 1000, co2=600))
+        await hass.async_block_till_done()
+        freezer.tick(timedelta(minutes=1))
+
+    state = hass.states.get("sensor.device_0_report_latency")
+    assert state.state == "0"
+    assert 1000 <= state.attributes["clock_skew"] <= 1001
+    assert 1000 <= state.attributes["report_delay"] <= 1001
+
+
+async def test_latency_after_clock_steps(hass, setup_dependencies, freezer):
+    """Clock steps re-seed the skew, while a single late report shows as latency."""
+    mqtt = setup_dependencies
+    mac = await _setup_device(hass)
+
+    async def deliver(offset):
+        mqtt.deliver(realtime_report(mac, int(time.time()) + offset, co2=600))
+        await hass.async_block_till_done()
+        freezer.tick(timedelta(minutes=5))
+        return hass.states.get("sensor.device_0_report_latency").state
+
+    for _ in range(3):
+        assert await deliver(0) == "0"
+    # The device clock jumps ten minutes ahead
+    assert await deliver(600) == "0"
+    assert await deliver(600) == "0"
+    # One report held up for two minutes
+    assert await deliver(600 - 120) == "120"
+    assert await deliver(600) == "0"
+    # The device clock is set back, less than the report interval; only the first report shows the step
+    assert await deliver(400) == "200"
+    assert await deliver(400) == "0"
+    assert await deliver(400) == "0"
+
+
+async def test_non_numeric_keys_create_no_entities(hass, setup_dependencies, caplog):
+    """Unknown keys get a sensor only once they report a number."""
+    mqtt = setup_dependencies
+    mac = await _setup_device(hass)
+
+    mqtt.deliver(realtime_report(
+        mac, START, co2=600, label="kitchen", layout=[1, 2], calibration={"status": 1}, radon={"value": "7"},
+    ))
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.device_0_co2").state == "600"
+    assert hass.states.get("sensor.device_0_radon").state == "7"
+    for key in ("label", "layout", "calibration"):
+        assert hass.states.get(f"sensor.device_0_{key}") is None
+    assert "Invalid value received" not in caplog.text
@@ -0,0 +1,44 @@
+"""Tests for the configure_devices service."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.setup import async_setup_component
+
+from custom_components.qingping_cgs1.const import CONF_UPDATE_INTERVAL, DOMAIN, SERVICE_CONFIGURE_DEVICES
+
+from .conftest import mock_device_entry
+
+
+async def test_configure_devices_normalizes_macs(hass, setup_dependencies):
+    """MACs match whatever their case and separators."""
+    entry = mock_device_entry(0, "AABBCCDDEEFF")
+    entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_CONFIGURE_DEVICES,
+        {"macs": ["aa:bb:cc:dd:ee:ff", "AA-BB-CC-DD-EE-FF", "112233445566"], CONF_UPDATE_INTERVAL: 30},
+        blocking=True, return_response=True,
+    )
+
+    assert response["devices"]["AABBCCDDEEFF"]["success"]
+    assert response["devices"]["112233445566"] == {"success": False, "latency": None, "error": "not configured"}
+    assert len(response["devices"]) == 2
+    assert entry.data[CONF_UPDATE_INTERVAL] == 30
+    assert setup_dependencies.published[-1][0] == "qingping/AABBCCDDEEFF/down"
+
+
+async def test_configure_devices_unknown_group(hass, setup_dependencies):
+    """An unknown group name is an error rather than an empty result."""
+    mock_device_entry(0).add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_CONFIGURE_DEVICES, {"group": "Nowhere", CONF_UPDATE_INTERVAL: 30},
+            blocking=True, return_response=True,
+        )
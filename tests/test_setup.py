@@ -0,0 +1,78 @@
+"""Startup test for many Qingping CGS1 entries against an unusable broker."""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.setup import async_setup_component
+
+from custom_components.qingping_cgs1.const import DOMAIN
+from custom_components.qingping_cgs1.sensor import ensure_mqtt_connected
+
+from .conftest import mock_device_entry
+from .replay import ReplayMQTT
+
+ENTRY_COUNT = 50
+# MQTT calls below never finish, so setup only completes if it does not wait on them.
+# The timeout turns a regression into a failure instead of a hung test.
+SETUP_TIMEOUT = 60  # seconds
+
+
+class HangingMQTT(ReplayMQTT):
+    """MQTT stand-in for a broker that is down or never answers."""
+
+    def __init__(self, connected):
+        """Initialize the stand-in."""
+        super().__init__()
+        self.connected = connected
+        self.publish_attempts = 0
+        self.connection_checks = 0
+        self._never = asyncio.Event()
+
+    def is_connected(self, hass):
+        """Report the configured connection state."""
+        return self.connected
+
+    async def ensure_connected(self, hass):
+        """Wait for a connection that never comes."""
+        self.connection_checks += 1
+        await self._never.wait()
+        return False
+
+    async def async_publish(self, hass, topic, payload, qos=0, retain=False, encoding="utf-8"):
+        """Hang like a publish to an unresponsive broker."""
+        self.publish_attempts += 1
+        await self._never.wait()
+
+
+@pytest.mark.parametrize("connected", [False, True], ids=["disconnected", "unresponsive"])
+async def test_setup_does_not_wait_for_mqtt(hass, setup_dependencies, connected):
+    """Set up many entries without waiting on MQTT connection checks or publishes."""
+    mqtt = HangingMQTT(connected)
+    setup_dependencies.is_connected = mqtt.is_connected
+    setup_dependencies.async_publish = mqtt.async_publish
+
+    entries = [mock_device_entry(index) for index in range(ENTRY_COUNT)]
+    for entry in entries:
+        entry.add_to_hass(hass)
+
+    ensure_connected = mqtt.ensure_connected if not connected else ensure_mqtt_connected
+    with patch("custom_components.qingping_cgs1.sensor.ensure_mqtt_connected", ensure_connected):
+        async with asyncio.timeout(SETUP_TIMEOUT):
+            assert await async_setup_component(hass, DOMAIN, {})
+            await hass.async_block_till_done()
+
+        assert all(entry.state is ConfigEntryState.LOADED for entry in entries)
+        # Every entry subscribed, while its config publish is still waiting in the background
+        assert setup_dependencies.subscription_count == ENTRY_COUNT
+        assert not setup_dependencies.published
+        if connected:
+            assert mqtt.publish_attempts == ENTRY_COUNT
+        else:
+            assert mqtt.connection_checks == ENTRY_COUNT
+
+        for entry in entries:
+            assert await hass.config_entries.async_unload(entry.entry_id)
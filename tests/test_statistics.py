@@ -0,0 +1,139 @@
+"""Tests for the external statistics batcher."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import time
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.qingping_cgs1.statistics import (
+    STATISTICS_FLUSH_INTERVAL, STATISTICS_PERIOD, StatisticsBatcher,
+)
+
+MAC = "AABBCC000000"
+
+
+@pytest.fixture
+def imported(hass):
+    """Collect the rows handed to the recorder, keyed by hour start."""
+    hass.config.components.add("recorder")
+    rows = {}
+
+    def add_external_statistics(hass, metadata, statistics):
+        for row in statistics:
+            rows[row["start"]] = row
+
+    with patch(
+        "custom_components.qingping_cgs1.statistics.async_add_external_statistics",
+        side_effect=add_external_statistics,
+    ):
+        yield rows
+
+
+def _hour(timestamp):
+    """Return the start of the hour holding timestamp."""
+    return datetime.fromtimestamp(timestamp - timestamp % STATISTICS_PERIOD, timezone.utc)
+
+
+async def _started_batcher(hass):
+    """Return a running batcher."""
+    batcher = StatisticsBatcher(hass)
+    await batcher.async_start()
+    return batcher
+
+
+async def test_stop_imports_open_hour(hass, imported):
+    """Samples in the current hour are imported when the batcher stops."""
+    now = int(time.time())
+    batcher = await _started_batcher(hass)
+    batcher.add(MAC, "co2", "CO2", "ppm", now, 500)
+    batcher.flush()
+    assert not imported
+
+    await batcher.async_stop()
+    assert imported[_hour(now)]["mean"] == 500
+
+
+async def test_final_write_imports_open_hour(hass, imported):
+    """Samples in the current hour are imported when Home Assistant shuts down."""
+    now = int(time.time())
+    batcher = await _started_batcher(hass)
+    batcher.add(MAC, "co2", "CO2", "ppm", now, 500)
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    assert imported[_hour(now)]["mean"] == 500
+
+    await batcher.async_stop()
+
+
+async def test_restart_merges_saved_hour(hass, imported):
+    """Samples after a restart are merged with the hour saved before it."""
+    now = int(time.time())
+    batcher = await _started_batcher(hass)
+    batcher.add(MAC, "co2", "CO2", "ppm", now, 400)
+    batcher.add(MAC, "co2", "CO2", "ppm", now, 600)
+    await batcher.async_stop()
+
+    batcher = await _started_batcher(hass)
+    batcher.add(MAC, "co2", "CO2", "ppm", now, 800)
+    await batcher.async_stop()
+
+    row = imported[_hour(now)]
+    assert (row["mean"], row["min"], row["max"]) == (600, 400, 800)
+
+
+async def test_late_samples_for_dropped_hour_are_skipped(hass, imported):
+    """A late sample does not replace an imported hour that is no longer held."""
+    now = int(time.time())
+    old = now - 30 * STATISTICS_PERIOD
+    batcher = await _started_batcher(hass)
+    batcher.add(MAC, "co2", "CO2", "ppm", old, 400)
+    batcher.add(MAC, "co2", "CO2", "ppm", old, 600)
+    batcher.flush()
+    assert imported[_hour(old)]["mean"] == 500
+    imported.clear()
+
+    batcher.add(MAC, "co2", "CO2", "ppm", old, 2000)
+    await batcher.async_stop()
+    assert not imported
+
+
+async def test_saves_only_after_changes(hass, imported, freezer):
+    """The timer writes the store only when samples or imports changed it."""
+    freezer.move_to("2026-01-01 10:00:00+00:00")
+    batcher = await _started_batcher(hass)
+
+    async def tick():
+        freezer.tick(STATISTICS_FLUSH_INTERVAL)
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    with patch.object(batcher._store, "async_delay_save") as delay_save, patch.object(
+        batcher._store, "async_save"
+    ) as save:
+        for _ in range(3):
+            await tick()
+        assert not delay_save.called
+
+        batcher.add(MAC, "co2", "CO2", "ppm", int(time.time()), 500)
+        await tick()
+        assert delay_save.call_count == 1
+        delay_save.call_args.args[0]()
+
+        # The open hour is neither imported nor changed again, so nothing new is saved
+        await tick()
+        assert delay_save.call_count == 1
+
+        await batcher.async_stop()
+        assert save.call_count == 1
+
+    batcher = await _started_batcher(hass)
+    with patch.object(batcher._store, "async_save") as save:
+        await batcher.async_stop()
+    assert not save.called
@@ -0,0 +1,120 @@
+"""Tests for traffic capture and replay."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+import voluptuous as vol
+
+from homeassistant.core import Context
+from homeassistant.exceptions import Unauthorized
+from homeassistant.setup import async_setup_component
+
+from custom_components.qingping_cgs1.const import DOMAIN, SERVICE_START_TRAFFIC_CAPTURE
+from custom_components.qingping_cgs1.traffic import (
+    TRAFFIC_MAGIC, TrafficRecord, TrafficWriter, encode_record, read_traffic,
+)
+
+from .conftest import mock_device_entry, realtime_report
+from .replay import ReplayMQTT, async_replay_capture
+
+
+def test_writer_round_trip(tmp_path):
+    """Records written over several flushes read back unchanged."""
+    path = tmp_path / "traffic.bin"
+    writer = TrafficWriter(path)
+    writer.add("qingping/AABBCC000000/up", '{"type": "12"}', timestamp=1.5)
+    writer.add("qingping/AABBCC000000/down", b"\x00\xff", timestamp=2.25)
+    writer.flush()
+    writer.add("qingping/AABBCC000001/up", "café", timestamp=3.0)
+    writer.flush()
+
+    assert writer.count == 3
+    assert list(read_traffic(path)) == [
+        TrafficRecord(1.5, "qingping/AABBCC000000/up", b'{"type": "12"}'),
+        TrafficRecord(2.25, "qingping/AABBCC000000/down", b"\x00\xff"),
+        TrafficRecord(3.0, "qingping/AABBCC000001/up", "café".encode()),
+    ]
+
+
+def test_read_traffic_skips_truncated_record(tmp_path):
+    """An interrupted capture keeps every complete record."""
+    path = tmp_path / "traffic.bin"
+    complete = TrafficRecord(1.0, "qingping/a/up", b"complete")
+    truncated = encode_record(TrafficRecord(2.0, "qingping/a/up", b"truncated"))
+    path.write_bytes(TRAFFIC_MAGIC + encode_record(complete) + truncated[:-3])
+
+    assert list(read_traffic(path)) == [complete]
+
+
+def test_read_traffic_rejects_other_files(tmp_path):
+    """Files without the capture header are refused."""
+    path = tmp_path / "traffic.bin"
+    path.write_bytes(b"not a capture")
+
+    with pytest.raises(ValueError):
+        list(read_traffic(path))
+
+
+@pytest.mark.parametrize("filename", ["../traffic.bin", "/tmp/traffic.bin", "logs/traffic.bin", "..\\traffic.bin", ".."])
+async def test_capture_rejects_paths(hass, setup_dependencies, filename):
+    """Capture files cannot be written outside the configuration directory."""
+    mock_device_entry(0).add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_START_TRAFFIC_CAPTURE, {"filename": filename}, blocking=True
+        )
+
+
+async def test_capture_requires_admin(hass, setup_dependencies, hass_read_only_user):
+    """Non-admin users cannot start a capture."""
+    mock_device_entry(0).add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_START_TRAFFIC_CAPTURE, {}, blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
+
+
+async def test_replay_capture(hass, setup_dependencies, tmp_path):
+    """A capture replayed offline sets up its devices and drives their sensors."""
+    mac = "AABBCC000000"
+    path = tmp_path / "traffic.bin"
+    writer = TrafficWriter(path)
+    for record in (
+        realtime_report(mac, 1_700_000_000, co2=650, pm25=8, temperature=21.4),
+        realtime_report(mac, 1_700_000_060, co2=700, pm25=9, temperature=21.6),
+    ):
+        writer.add(record.topic, record.payload, record.timestamp)
+    writer.flush()
+
+    assert await async_replay_capture(hass, setup_dependencies, path) == 2
+
+    assert hass.states.get("sensor.device_0_co2").state == "700"
+    assert hass.states.get("sensor.device_0_pm25").state == "9"
+    assert hass.states.get("sensor.device_0_temperature").state == "21.6"
+    assert hass.states.get("sensor.device_0_status").state == "online"
+
+
+@pytest.mark.parametrize("speed", [1, 10])
+async def test_replay_keeps_timing(tmp_path, speed):
+    """Replay waits the captured gap between messages, scaled by the speed."""
+    path = tmp_path / "traffic.bin"
+    writer = TrafficWriter(path)
+    for timestamp in (100.0, 160.0, 160.0, 130.0, 190.0):
+        writer.add("qingping/AABBCC000000/up", "{}", timestamp)
+    writer.flush()
+    mqtt = ReplayMQTT()
+    delivered = []
+    await mqtt.async_subscribe(None, "qingping/+/up", lambda message: delivered.append(message.timestamp))
+
+    with patch("tests.replay.asyncio.sleep") as sleep:
+        assert await mqtt.async_replay(path, speed) == 5
+
+    # Messages captured out of order are delivered right away
+    assert [call.args[0] for call in sleep.await_args_list] == [60 / speed, 60 / speed]
+    assert delivered == [100.0, 160.0, 160.0, 130.0, 190.0]